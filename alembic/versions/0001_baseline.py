@@ -0,0 +1,106 @@
+"""baseline schema with hot-path indexes
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+Tablolar daha önce Base.metadata.create_all ile oluşturulmuş olabilir; bu yüzden
+mevcut tablolar atlanır ve yalnızca eksik indeksler eklenir.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    # (isim, tablo, kolonlar, unique)
+    ("ix_users_id", "users", ["id"], False),
+    ("ix_users_email", "users", ["email"], True),
+    ("ix_users_full_name", "users", ["full_name"], False),
+    ("ix_users_is_barber_id", "users", ["is_barber", "id"], False),
+    ("ix_services_id", "services", ["id"], False),
+    ("ix_services_name", "services", ["name"], False),
+    ("ix_services_barber_id", "services", ["barber_id"], False),
+    ("ix_working_hours_id", "working_hours", ["id"], False),
+    ("ix_working_hours_barber_day", "working_hours", ["barber_id", "day_of_week"], False),
+    ("ix_bookings_id", "bookings", ["id"], False),
+    ("ix_bookings_barber_start_status", "bookings", ["barber_id", "start_time", "status"], False),
+    ("ix_bookings_customer_email", "bookings", ["customer_email"], False),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    if "users" not in tables:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("email", sa.String(), nullable=False),
+            sa.Column("hashed_password", sa.String(), nullable=False),
+            sa.Column("full_name", sa.String()),
+            sa.Column("phone_number", sa.String(), unique=True),
+            sa.Column("is_active", sa.Boolean()),
+            sa.Column("is_barber", sa.Boolean()),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("barber_bio", sa.Text(), nullable=True),
+            sa.Column("barber_shop_name", sa.String(), nullable=True),
+            sa.Column("barber_shop_address", sa.String(), nullable=True),
+        )
+
+    if "services" not in tables:
+        op.create_table(
+            "services",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String()),
+            sa.Column("description", sa.Text()),
+            sa.Column("duration", sa.Integer()),
+            sa.Column("price", sa.Float()),
+            sa.Column("barber_id", sa.Integer(), sa.ForeignKey("users.id")),
+        )
+
+    if "working_hours" not in tables:
+        op.create_table(
+            "working_hours",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("day_of_week", sa.Integer()),
+            sa.Column("start_time", sa.Time()),
+            sa.Column("end_time", sa.Time()),
+            sa.Column("is_working", sa.Boolean()),
+            sa.Column("barber_id", sa.Integer(), sa.ForeignKey("users.id")),
+        )
+
+    if "bookings" not in tables:
+        op.create_table(
+            "bookings",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("customer_name", sa.String()),
+            sa.Column("customer_email", sa.String()),
+            sa.Column("customer_phone", sa.String()),
+            sa.Column("start_time", sa.DateTime()),
+            sa.Column("end_time", sa.DateTime()),
+            sa.Column("notes", sa.Text(), nullable=True),
+            sa.Column("status", sa.String()),
+            sa.Column("barber_id", sa.Integer(), sa.ForeignKey("users.id")),
+            sa.Column("service_id", sa.Integer(), sa.ForeignKey("services.id")),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+
+    for name, table, columns, unique in INDEXES:
+        existing = {index["name"] for index in inspector.get_indexes(table)} if table in tables else set()
+        if name not in existing:
+            op.create_index(name, table, columns, unique=unique)
+
+
+def downgrade() -> None:
+    for name, table, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
+    op.drop_table("bookings")
+    op.drop_table("working_hours")
+    op.drop_table("services")
+    op.drop_table("users")
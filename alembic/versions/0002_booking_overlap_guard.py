@@ -0,0 +1,59 @@
+"""database-level guard against overlapping confirmed bookings
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+Postgres: btree_gist exclusion constraint on (barber_id, tsrange(start_time, end_time))
+for confirmed bookings. SQLite: equivalent BEFORE INSERT/UPDATE triggers that abort
+with 'booking_overlap'.
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+SQLITE_OVERLAP_CHECK = """
+    NEW.status = 'confirmed' AND EXISTS (
+        SELECT 1 FROM bookings
+        WHERE barber_id = NEW.barber_id
+          AND status = 'confirmed'
+          AND id IS NOT NEW.id
+          AND start_time < NEW.end_time
+          AND end_time > NEW.start_time
+    )
+"""
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+        op.execute(
+            "ALTER TABLE bookings ADD CONSTRAINT bookings_no_overlap "
+            "EXCLUDE USING gist (barber_id WITH =, tsrange(start_time, end_time) WITH &&) "
+            "WHERE (status = 'confirmed')"
+        )
+    elif dialect == "sqlite":
+        op.execute(
+            "CREATE TRIGGER bookings_no_overlap_insert BEFORE INSERT ON bookings "
+            f"WHEN {SQLITE_OVERLAP_CHECK} "
+            "BEGIN SELECT RAISE(ABORT, 'booking_overlap'); END"
+        )
+        op.execute(
+            "CREATE TRIGGER bookings_no_overlap_update BEFORE UPDATE OF start_time, end_time, status ON bookings "
+            f"WHEN {SQLITE_OVERLAP_CHECK} "
+            "BEGIN SELECT RAISE(ABORT, 'booking_overlap'); END"
+        )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute("ALTER TABLE bookings DROP CONSTRAINT IF EXISTS bookings_no_overlap")
+    elif dialect == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS bookings_no_overlap_insert")
+        op.execute("DROP TRIGGER IF EXISTS bookings_no_overlap_update")
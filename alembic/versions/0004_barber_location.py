@@ -0,0 +1,28 @@
+"""barber location with geohash index for nearby search
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("users", sa.Column("latitude", sa.Float(), nullable=True))
+    op.add_column("users", sa.Column("longitude", sa.Float(), nullable=True))
+    op.add_column("users", sa.Column("geohash", sa.String(12), nullable=True))
+    op.create_index("ix_users_geohash", "users", ["geohash"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_geohash", table_name="users")
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.drop_column("geohash")
+        batch_op.drop_column("longitude")
+        batch_op.drop_column("latitude")
@@ -0,0 +1,34 @@
+"""per-date schedule exceptions (closed days, extra hours)
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "schedule_exceptions",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("start_time", sa.Time(), nullable=True),
+        sa.Column("end_time", sa.Time(), nullable=True),
+        sa.Column("is_working", sa.Boolean(), nullable=True),
+        sa.Column("note", sa.String(), nullable=True),
+        sa.Column("barber_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+    )
+    op.create_index("ix_schedule_exceptions_id", "schedule_exceptions", ["id"])
+    op.create_index("ix_schedule_exceptions_barber_date", "schedule_exceptions", ["barber_id", "date"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_schedule_exceptions_barber_date", table_name="schedule_exceptions")
+    op.drop_index("ix_schedule_exceptions_id", table_name="schedule_exceptions")
+    op.drop_table("schedule_exceptions")
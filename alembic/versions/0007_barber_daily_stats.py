@@ -0,0 +1,30 @@
+"""barber daily stats rollup
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "barber_daily_stats",
+        sa.Column("barber_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("bookings", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("cancellations", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("revenue", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("booked_minutes", sa.Integer(), nullable=False, server_default="0"),
+    )
+    # Mevcut veriler için: python -m app.scripts.rebuild_daily_stats
+
+
+def downgrade() -> None:
+    op.drop_table("barber_daily_stats")
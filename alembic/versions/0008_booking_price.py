@@ -0,0 +1,27 @@
+"""booking price at booking time
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("bookings", sa.Column("price", sa.Float(), nullable=True))
+    # Mevcut randevular için bilinen tek fiyat servisin güncel fiyatıdır
+    op.execute(
+        "UPDATE bookings SET price = "
+        "(SELECT services.price FROM services WHERE services.id = bookings.service_id)"
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("bookings") as batch_op:
+        batch_op.drop_column("price")
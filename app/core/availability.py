@@ -0,0 +1,145 @@
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.events import SlotChange, slot_changes
+
+# Slot adımı (dakika) - müşteriye her 15 dakikada bir başlangıç saati gösterilir
+SLOT_STEP_MINUTES = 15
+
+Interval = Tuple[datetime, datetime]
+
+# (barber_id, service_id, tarih) -> AvailableSlots
+availability_cache = LRUCache(
+    "availability",
+    maxsize=settings.AVAILABILITY_CACHE_SIZE,
+    ttl=settings.AVAILABILITY_CACHE_TTL,
+)
+
+
+def availability_tags(barber_id: int, day: date) -> Tuple[tuple, tuple, tuple]:
+    return ("barber", barber_id), ("barber_weekday", barber_id, day.weekday()), ("barber_day", barber_id, day)
+
+
+def invalidate_barber_days(barber_id: int, start: datetime, end: datetime) -> None:
+    """Drop cached slots of every day touched by [start, end]"""
+    days = []
+    day = start.date()
+    while day <= end.date():
+        availability_cache.invalidate_tag(("barber_day", barber_id, day))
+        days.append(day)
+        day += timedelta(days=1)
+    # Canlı müsaitlik akışlarına bildir (önbellek temizlendikten sonra: yeniden hesaplama taze okur)
+    slot_changes.publish(SlotChange(barber_id, days=frozenset(days)))
+
+
+def invalidate_barber(barber_id: int) -> None:
+    """Drop all cached slots of a barber (working hours changed)"""
+    availability_cache.invalidate_tag(("barber", barber_id))
+    slot_changes.publish(SlotChange(barber_id))
+
+
+def invalidate_barber_weekdays(barber_id: int, weekdays: Iterable[int]) -> None:
+    """Drop cached slots of the given weekdays (weekly hours of those days changed)"""
+    weekdays = frozenset(weekdays)
+    for weekday in weekdays:
+        availability_cache.invalidate_tag(("barber_weekday", barber_id, weekday))
+    slot_changes.publish(SlotChange(barber_id, weekdays=weekdays))
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """Sort busy intervals once and merge the overlapping ones"""
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _round_up(value: datetime, origin: datetime, step: timedelta) -> datetime:
+    """Smallest origin + k * step that is >= value"""
+    if value <= origin:
+        return origin
+    steps = -((origin - value) // step)
+    return origin + steps * step
+
+
+def sweep_free_slots(
+    windows: Sequence[Interval],
+    busy: Sequence[Interval],
+    duration: timedelta,
+    step: timedelta = timedelta(minutes=SLOT_STEP_MINUTES),
+    start_index: int = 0,
+) -> List[datetime]:
+    """
+    Sweep candidate start times across sorted working windows and merged busy
+    intervals in a single pass: O(slots + bookings) instead of O(slots * bookings).
+    `busy` must come from merge_intervals (sorted and disjoint).
+    """
+    slots: List[datetime] = []
+    i = start_index
+    for window_start, window_end in windows:
+        current = window_start
+        while current + duration <= window_end:
+            # Bu başlangıçtan önce biten dolu aralıkları atla
+            while i < len(busy) and busy[i][1] <= current:
+                i += 1
+            if i < len(busy) and busy[i][0] < current + duration:
+                # Çakışma var: dolu aralığın bittiği ilk adıma atla
+                current = _round_up(busy[i][1], window_start, step)
+                continue
+            slots.append(current)
+            current += step
+    return slots
+
+
+def compute_range_slots(
+    start_date: date,
+    end_date: date,
+    windows_for: Callable[[date], List[Interval]],
+    bookings: Iterable[Interval],
+    duration_minutes: int,
+) -> Dict[date, List[datetime]]:
+    """
+    Available start times for every day in [start_date, end_date].
+    `windows_for(day)` returns the sorted, disjoint working windows of a day.
+    Bookings are merged once for the whole range and the sweep pointer only
+    moves forward, so the cost is linear in days, slots and bookings.
+    """
+    busy = merge_intervals(bookings)
+    duration = timedelta(minutes=duration_minutes)
+    step = timedelta(minutes=SLOT_STEP_MINUTES)
+
+    result: Dict[date, List[datetime]] = {}
+    i = 0
+    current_date = start_date
+    while current_date <= end_date:
+        windows = windows_for(current_date)
+        # Önceki günlere ait dolu aralıkları tekrar taramamak için işaretçiyi ilerlet
+        day_start = datetime.combine(current_date, time.min)
+        while i < len(busy) and busy[i][1] <= day_start:
+            i += 1
+        result[current_date] = sweep_free_slots(windows, busy, duration, step, start_index=i)
+        current_date += timedelta(days=1)
+    return result
+
+
+def compute_day_slots(
+    windows: Sequence[Interval],
+    bookings: Iterable[Interval],
+    durations: Iterable[int],
+) -> Dict[int, List[datetime]]:
+    """
+    Available start times of one barber's day for several service durations.
+    Windows and bookings are prepared once and shared by every duration.
+    """
+    busy = merge_intervals(bookings)
+    step = timedelta(minutes=SLOT_STEP_MINUTES)
+    return {
+        minutes: sweep_free_slots(windows, busy, timedelta(minutes=minutes), step)
+        for minutes in set(durations)
+    }
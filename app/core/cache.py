@@ -0,0 +1,197 @@
+import itertools
+import mmap
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+from app.core.config import settings
+
+# İsimle kayıtlı tüm önbellekler (istatistik uç noktası için)
+caches: Dict[str, "LRUCache"] = {}
+
+_MISSING = object()
+
+_STAMP_BITS = 40
+
+
+class SharedVersions:
+    """
+    Invalidation stamps in an anonymous shared memory map, one 64-bit slot per
+    tag hash. The map is created at import time, so with a preloaded app (see
+    gunicorn.conf.py) every forked worker shares it: a bump in one worker is
+    visible to all others on their next read, without any message passing.
+
+    Every bump writes a value never written before (pid + per-process counter),
+    so concurrent bumps need no lock: readers only compare stamps for equality.
+    Hash collisions can only cause extra invalidations, never stale reads.
+    """
+
+    def __init__(self, slots: int):
+        self.slots = slots
+        self._map = mmap.mmap(-1, slots * 8)
+        self._stamps = memoryview(self._map).cast("Q")
+        self._pid = None
+        self._counter = itertools.count(1)
+
+    def _slot(self, key: Hashable) -> int:
+        return zlib.crc32(repr(key).encode()) % self.slots
+
+    def get(self, key: Hashable) -> int:
+        return self._stamps[self._slot(key)]
+
+    def bump(self, key: Hashable) -> None:
+        pid = os.getpid()
+        if pid != self._pid:
+            # fork sonrası sayaç süreç başına yeniden başlar
+            self._pid, self._counter = pid, itertools.count(1)
+        stamp = ((pid & 0xFFFFFF) << _STAMP_BITS) | (next(self._counter) & ((1 << _STAMP_BITS) - 1))
+        self._stamps[self._slot(key)] = stamp
+
+
+# Tüm önbelleklerin worker'lar arası geçersiz kılma kanalı
+shared_versions = SharedVersions(settings.CROSS_WORKER_INVALIDATION_SLOTS)
+
+
+class LRUCache:
+    """
+    Thread-safe, size-bounded LRU cache with a per-entry TTL.
+    Entries can carry tags so that writes invalidate exactly the keys they affect.
+    Tag invalidations also reach the same cache in the other worker processes
+    through `shared`: entries remember the shared stamps of their tags and are
+    treated as missing once any of them changed.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float, shared: Optional[SharedVersions] = shared_versions):
+        self.name = name
+        self.shared = shared
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._tags: Dict[Hashable, Set[Hashable]] = {}
+        # Her etiketin geçersiz kılma sayacı; hesaplama sırasında gelen yazmaları yakalar
+        self._tag_versions: Dict[Hashable, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        caches[name] = self
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            value, expires_at, tags, stamps = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return default
+            if stamps != self._shared_stamps(tags):
+                # Başka bir worker bu etiketi geçersiz kıldı
+                self._remove(key)
+                self.invalidations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def snapshot(self, tags: Iterable[Hashable]) -> Tuple[int, ...]:
+        """Invalidation versions of `tags`; pass to set() to drop results computed from stale reads"""
+        with self._lock:
+            return self._snapshot(tags)
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        tags: Iterable[Hashable] = (),
+        snapshot: Optional[Tuple[int, ...]] = None
+    ) -> bool:
+        tags = tuple(tags)
+        with self._lock:
+            if snapshot is not None and snapshot != self._snapshot(tags):
+                return False
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, time.monotonic() + self.ttl, tags, self._shared_stamps(tags))
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._data) > self.maxsize:
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+            return True
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+                self.invalidations += 1
+
+    def invalidate_tag(self, tag: Hashable) -> int:
+        """Drop every entry carrying `tag`, returns the number of removed entries"""
+        with self._lock:
+            if len(self._tag_versions) >= 4 * self.maxsize:
+                # Sayaç tablosunu sınırlı tut; epoch değiştiği için eski snapshot'lar geçersiz olur
+                self._tag_versions.clear()
+                self._epoch += 1
+            self._tag_versions[tag] = self._tag_versions.get(tag, 0) + 1
+            if self.shared is not None:
+                self.shared.bump((self.name, tag))
+            keys = self._tags.pop(tag, set())
+            for key in keys:
+                if key in self._data:
+                    self._remove(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._tags.clear()
+            self._tag_versions.clear()
+            self._epoch += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _snapshot(self, tags: Iterable[Hashable]) -> Tuple[int, ...]:
+        tags = tuple(tags)
+        return (self._epoch,) + tuple(self._tag_versions.get(tag, 0) for tag in tags) + self._shared_stamps(tags)
+
+    def _shared_stamps(self, tags: Tuple[Hashable, ...]) -> Tuple[int, ...]:
+        if self.shared is None:
+            return ()
+        return tuple(self.shared.get((self.name, tag)) for tag in tags)
+
+    def _remove(self, key: Hashable) -> None:
+        # Kilit çağıran tarafından tutulmalı
+        _, _, tags, _ = self._data.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: cache.stats() for name, cache in caches.items()}
@@ -0,0 +1,33 @@
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+from app.core.config import settings
+
+
+def catalog_etag(barber_id: int, version: int, resource: str) -> str:
+    """Strong ETag of a public catalog resource at a given barber catalog version"""
+    return f'"b{barber_id}-{resource}-v{version}"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match zayıf karşılaştırma kullanır (RFC 9110 13.1.2)
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def cache_headers(etag: str) -> dict:
+    return {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.CATALOG_CACHE_MAX_AGE}",
+    }
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """304 response when the client already holds `etag`, otherwise None"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(etag))
+    return None
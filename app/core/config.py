@@ -1,4 +1,14 @@
-from pydantic import BaseSettings
+from typing import List, Optional
+
+from pydantic import BaseModel, BaseSettings
+
+class RateLimitRule(BaseModel):
+    """Token bucket (rate tokens/second, up to burst) per client on one route"""
+    route: str  # "METHOD /path", path şablonu {param} içerebilir
+    rate: float
+    burst: int
+    per: str = "ip"  # "ip" ya da "user" (token yoksa IP'ye düşer)
+    concurrency: Optional[int] = None  # rota başına eşzamanlı istek sınırı (süreç içi)
 
 class Settings(BaseSettings):
     # API ve güvenlik ayarları
@@ -7,8 +17,102 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 1 hafta
 
+    # Parola hash'leme: bcrypt maliyeti, thread sayısı ve bekleme kuyruğu sınırı
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_SIZE: int = 32
+
+    # Doğrulanmış kullanıcı önbelleği (token subject başına)
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL: int = 60  # saniye
+
+    # Müsaitlik sorgusunda izin verilen en uzun tarih aralığı (gün)
+    AVAILABILITY_MAX_RANGE_DAYS: int = 31
+
+    # Berber başına randevu yazma kilidi için en fazla bekleme (Postgres lock_timeout)
+    BOOKING_LOCK_TIMEOUT_MS: int = 2000
+
+    # Berber istatistiklerinde izin verilen en uzun tarih aralığı (gün)
+    STATS_MAX_RANGE_DAYS: int = 366
+
+    # Toplu / tekrarlı randevuda tek istekte izin verilen en fazla tekrar
+    BULK_BOOKING_MAX_OCCURRENCES: int = 100
+
+    # Müsaitlik önbelleği (barber_id, service_id, tarih) başına
+    AVAILABILITY_CACHE_SIZE: int = 10000
+    AVAILABILITY_CACHE_TTL: int = 300  # saniye
+
+    # Derlenmiş çalışma takvimi önbelleği (berber başına dakika bitmap'leri)
+    SCHEDULE_CACHE_SIZE: int = 10000
+    SCHEDULE_CACHE_TTL: int = 3600  # saniye
+
+    # Canlı müsaitlik akışı (SSE): abone kuyruğu dolunca istemci düşürülür
+    AVAILABILITY_STREAM_QUEUE_SIZE: int = 16
+    AVAILABILITY_STREAM_HEARTBEAT: float = 15  # saniye
+    # Diğer worker'lardaki değişiklikleri yakalamak için paylaşımlı sürüm kontrol aralığı
+    AVAILABILITY_STREAM_POLL_INTERVAL: float = 0.5  # saniye
+
+    # Worker'lar arası önbellek geçersiz kılma: paylaşımlı bellekte etiket başına 8 baytlık slot
+    CROSS_WORKER_INVALIDATION_SLOTS: int = 65536
+
+    # İstek başına SQL ölçümü: X-DB-* yanıt başlıkları ve N+1 uyarı eşiği (0 = kapalı)
+    SQL_STATS_HEADERS: bool = False
+    SQL_N_PLUS_ONE_THRESHOLD: int = 10
+
+    # /barbers/nearby için izin verilen en büyük yarıçap (km)
+    NEARBY_MAX_RADIUS_KM: float = 50
+
+    # Herkese açık berber katalog yanıtları için Cache-Control max-age (saniye)
+    CATALOG_CACHE_MAX_AGE: int = 60
+
+    # Liste uç noktalarında ORM/pydantic yerine kolon seçimi + orjson (isteğe bağlı)
+    FAST_JSON_RESPONSES: bool = False
+
+    # Loglama: seviye (DEBUG/INFO/WARNING/...) ve biçim ("text" ya da satır başına "json")
+    LOG_LEVEL: str = "WARNING"
+    LOG_FORMAT: str = "text"
+
+    # İstek profilleme: X-Profile başlığı bu değerle eşleşirse istek örneklenir (boş = kapalı)
+    PROFILING_TOKEN: Optional[str] = None
+    PROFILING_INTERVAL_MS: float = 5
+    PROFILING_MAX_STORED: int = 20
+
+    # Hız sınırlama: kurallar JSON liste olarak ezilebilir; backend "memory" ya da "fake-shared"
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_RULES: List[RateLimitRule] = [
+        RateLimitRule(route="POST /api/v1/auth/login", rate=10 / 60, burst=10, concurrency=32),
+        RateLimitRule(route="POST /api/v1/auth/register", rate=5 / 60, burst=5, concurrency=16),
+        RateLimitRule(route="POST /api/v1/bookings/bookings", rate=1, burst=10, per="user", concurrency=64),
+        RateLimitRule(route="POST /api/v1/bookings/bulk", rate=0.1, burst=3, per="user", concurrency=8),
+    ]
+
+    # Idempotency-Key desteklenen POST rotaları; tamamlanan yanıtlar TTL boyunca tekrar oynatılır
+    IDEMPOTENCY_ENABLED: bool = True
+    IDEMPOTENCY_BACKEND: str = "database"  # "database" ya da "memory" (tek süreç)
+    IDEMPOTENCY_ROUTES: List[str] = [
+        "POST /api/v1/auth/register",
+        "POST /api/v1/bookings/bookings",
+        "POST /api/v1/bookings/bulk",
+    ]
+    IDEMPOTENCY_TTL: int = 24 * 60 * 60  # saniye
+    # Çalışan isteğin anahtarı tutma süresi (süreç ölürse sonra devralınır)
+    IDEMPOTENCY_LOCK_TIMEOUT: int = 60  # saniye
+    # Aynı anahtarla eşzamanlı gelen isteğin ilkini bekleme süresi; aşılırsa 409
+    IDEMPOTENCY_WAIT_TIMEOUT: float = 10  # saniye
+
     # Veritabanı URL'si
     DATABASE_URL: str
+    # Boş bırakılırsa DATABASE_URL'den türetilir (asyncpg / aiosqlite)
+    ASYNC_DATABASE_URL: Optional[str] = None
+
+    # Okuma replikaları (JSON liste, ör. '["postgresql://replica1/db"]' ya da yerelde '["sqlite:///./replica.db"]');
+    # boşsa her şey birincil veritabanında
+    DATABASE_REPLICA_URLS: List[str] = []
+    # Replika sağlık kontrolü aralığı (saniye); sağlıksız replika bu süre boyunca atlanır
+    REPLICA_HEALTH_CHECK_INTERVAL: float = 10
+    # İstemcinin kendi yazmasından sonra okumalarının birincile sabitlendiği süre (saniye)
+    READ_YOUR_WRITES_SECONDS: float = 5
 
     class Config:
         env_file = ".env"
@@ -1,18 +1,188 @@
-from sqlalchemy import create_engine
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from app.core.config import settings
+from app.core.metrics import db_pool_checked_out, db_pool_checkout_wait
+
+# Senkron URL'den async sürücüye geçiş (postgresql -> asyncpg, sqlite -> aiosqlite)
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def get_async_database_url(url: str):
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    parsed = make_url(url)
+    return parsed.set(drivername=ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername))
+
+class _TimedCheckout:
+    """Records how long a checkout waited for a free connection (pool exhaustion)"""
+    metrics_label = ""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_wait.observe(time.perf_counter() - started, self.metrics_label)
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    metrics_label = "sync"
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    metrics_label = "async"
+
+class TimedReplicaQueuePool(_TimedCheckout, QueuePool):
+    metrics_label = "replica"
+
+def pool_options(url, sync_pool=TimedQueuePool) -> dict:
+    # Yalnızca sürücünün zaten kuyruklu havuz kullandığı durumda değiştir (ör. :memory: SQLite hariç)
+    parsed = make_url(url)
+    default = parsed.get_dialect().get_pool_class(parsed)
+    if issubclass(default, AsyncAdaptedQueuePool):
+        return {"poolclass": TimedAsyncAdaptedQueuePool}
+    if issubclass(default, QueuePool):
+        return {"poolclass": sync_pool}
+    return {}
 
 # SQLALCHEMY_DATABASE_URL değişkenini doğrudan settings.DATABASE_URL property'sini kullanarak alıyoruz
-engine = create_engine(settings.DATABASE_URL)
+engine = create_engine(settings.DATABASE_URL, **pool_options(settings.DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# async def handler'lar için: sorgular event loop'u bloklamaz
+_async_url = get_async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(_async_url, **pool_options(_async_url))
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 Base = declarative_base()
 
+
+# --- İstek başına SQL ölçümü ---
+
+# IN (?, ?, ?) gibi parametre listeleri uzunluktan bağımsız tek bir şekle indirgenir
+_PARAM_LIST_RE = re.compile(r"\(\s*(?:\?|%\(\w+\)s|:\w+|\$\d+)(?:\s*,\s*(?:\?|%\(\w+\)s|:\w+|\$\d+))*\s*\)")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+def statement_shape(statement: str) -> str:
+    return _PARAM_LIST_RE.sub("(?)", _WHITESPACE_RE.sub(" ", statement).strip())
+
+class QueryStats:
+    """Queries issued inside one track_queries() block (usually one request)"""
+
+    def __init__(self, keep_statements: bool = False, parent: Optional["QueryStats"] = None):
+        self.count = 0
+        self.total_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.shapes: Counter = Counter()
+        self.keep_statements = keep_statements
+        self.statements: List[Tuple[str, object]] = []
+        # İç içe ölçümde (ör. testteki assert_max_queries içinde istek ölçümü) dış blok da sayar
+        self.parent = parent
+
+    def record(self, statement: str, parameters, duration: float) -> None:
+        if self.parent is not None:
+            self.parent.record(statement, parameters, duration)
+        self.count += 1
+        self.total_time += duration
+        if duration >= self.slowest_time:
+            self.slowest_time = duration
+            self.slowest_statement = statement
+        self.shapes[statement_shape(statement)] += 1
+        if self.keep_statements:
+            self.statements.append((statement, parameters))
+
+    def repeated_statements(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statement shapes issued at least `threshold` times - likely N+1 patterns"""
+        if threshold <= 0:
+            return []
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+@contextmanager
+def track_queries(keep_statements: bool = False):
+    """Collect QueryStats for every statement executed in this context (nested blocks count towards the outer one too)"""
+    stats = QueryStats(keep_statements=keep_statements, parent=_query_stats.get())
+    token = _query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+
+@contextmanager
+def assert_max_queries(limit: int):
+    """Fail when the block issues more than `limit` queries (query-count regression guard for tests)"""
+    with track_queries() as stats:
+        yield stats
+    if stats.count > limit:
+        shapes = "\n".join(f"  {n}x {shape}" for shape, n in stats.shapes.most_common())
+        raise AssertionError(f"Expected at most {limit} queries, got {stats.count}:\n{shapes}")
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _query_stats.get() is not None:
+        context._query_start = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _query_stats.get()
+    started = getattr(context, "_query_start", None)
+    if stats is None or started is None:
+        return
+    stats.record(statement, parameters, time.perf_counter() - started)
+
+# Süreçteki tüm motorlar (fork sonrası bağlantı havuzlarını sıfırlamak için)
+_engines: List = []
+
+def instrument_engine(target_engine) -> None:
+    _engines.append(target_engine)
+    event.listen(target_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(target_engine, "after_cursor_execute", _after_cursor_execute)
+
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
+def dispose_engines_after_fork() -> None:
+    """
+    Call in each forked worker: connections opened by the parent must not be
+    shared, so the pools are replaced without closing the parent's sockets.
+    """
+    for target_engine in _engines:
+        target_engine.dispose(close=False)
+
+def _checked_out_connections():
+    pools = {"sync": engine.pool, "async": async_engine.sync_engine.pool}
+    return {
+        (label,): pool.checkedout()
+        for label, pool in pools.items()
+        if hasattr(pool, "checkedout")
+    }
+
+db_pool_checked_out.set_function(_checked_out_connections)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,172 @@
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, FrozenSet, Hashable, List, Optional, Set
+
+import orjson
+
+from app.core.config import settings
+from app.core.metrics import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+stream_subscribers = Gauge("availability_stream_subscribers", "Open availability event streams")
+stream_dropped = Counter("availability_stream_dropped_total", "Availability streams closed because the client fell behind")
+
+
+@dataclass(frozen=True)
+class SlotChange:
+    """Slots of a barber changed on some days; None means every day"""
+    barber_id: int
+    days: Optional[FrozenSet[date]] = None
+    weekdays: Optional[FrozenSet[int]] = None
+
+    def touches(self, day: date) -> bool:
+        if self.days is None and self.weekdays is None:
+            return True
+        return (self.days is not None and day in self.days) or \
+            (self.weekdays is not None and day.weekday() in self.weekdays)
+
+
+class Subscription:
+    """
+    One stream's bounded queue. Events are delivered on the subscriber's event
+    loop; when the queue is full the subscriber is dropped rather than buffered.
+    """
+
+    def __init__(self, broker: "SlotChangeBroker", barber_id: int, day: date, maxsize: int):
+        self.broker = broker
+        self.barber_id = barber_id
+        self.day = day
+        self.loop = asyncio.get_running_loop()
+        self.queue: "asyncio.Queue[Optional[SlotChange]]" = asyncio.Queue(maxsize=maxsize)
+        self.dropped = False
+
+    def _deliver(self, change: SlotChange) -> None:
+        # Olay döngüsünde çalışır
+        if self.dropped:
+            return
+        if self.queue.full():
+            self.dropped = True
+            self.broker.unsubscribe(self)
+            stream_dropped.inc()
+            # Bekleyen olaylar atılır; None akışı sonlandırır
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+            return
+        self.queue.put_nowait(change)
+
+    def notify(self, change: SlotChange) -> None:
+        """Thread-safe: called from request threads as well as the event loop"""
+        try:
+            self.loop.call_soon_threadsafe(self._deliver, change)
+        except RuntimeError:
+            # Döngü kapanmış (sunucu kapanıyor)
+            self.broker.unsubscribe(self)
+
+    async def next(self, timeout: float) -> Optional[SlotChange]:
+        """
+        Wait for the next change and coalesce everything already queued behind it
+        (a single recomputation covers them all). Raises asyncio.TimeoutError when
+        idle for `timeout` seconds; returns None once the subscription was dropped.
+        """
+        change = await asyncio.wait_for(self.queue.get(), timeout)
+        while change is not None and not self.queue.empty():
+            change = self.queue.get_nowait()
+        return change
+
+
+class SlotChangeBroker:
+    """In-process pub/sub of slot changes, fanned out per barber"""
+
+    def __init__(self):
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, barber_id: int, day: date) -> Subscription:
+        subscription = Subscription(self, barber_id, day, settings.AVAILABILITY_STREAM_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.setdefault(barber_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.barber_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.barber_id]
+
+    def publish(self, change: SlotChange) -> None:
+        with self._lock:
+            subscribers = [s for s in self._subscribers.get(change.barber_id, ()) if change.touches(s.day)]
+        for subscription in subscribers:
+            subscription.notify(change)
+
+    def count(self) -> int:
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+
+slot_changes = SlotChangeBroker()
+
+stream_subscribers.set_function(lambda: {(): slot_changes.count()})
+
+
+def sse_event(event: str, data) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+async def slot_diff_stream(
+    subscription: Subscription,
+    initial: List[datetime],
+    load_slots: Callable[[], Awaitable[Optional[List[datetime]]]],
+    watch: Callable[[], Hashable],
+) -> AsyncIterator[bytes]:
+    """
+    Server-sent events for one barber/service/day: a "snapshot" with the current
+    slots, then a "diff" (added/removed start times) after every change that
+    actually altered them. Idle streams get a comment line as heartbeat.
+
+    Changes made in this process arrive through the subscription right away;
+    changes made by other worker processes are noticed by polling `watch()`
+    (the shared invalidation stamps of the day) every poll interval.
+    """
+    poll_interval = settings.AVAILABILITY_STREAM_POLL_INTERVAL
+    try:
+        sent = initial
+        versions = watch()
+        idle = 0.0
+        yield sse_event("snapshot", {"date": subscription.day, "available_times": sent})
+        while True:
+            try:
+                change = await subscription.next(poll_interval)
+            except asyncio.TimeoutError:
+                if watch() == versions:
+                    idle += poll_interval
+                    if idle >= settings.AVAILABILITY_STREAM_HEARTBEAT:
+                        idle = 0.0
+                        yield b": keep-alive\n\n"
+                    continue
+                change = SlotChange(subscription.barber_id)
+            if change is None:
+                # Geride kalan istemci: akışı kapat, istemci yeniden bağlanıp snapshot alır
+                logger.info("availability stream of barber %d dropped (queue full)", subscription.barber_id)
+                return
+            # Yüklemeden önce: yükleme sırasında gelen değişiklik bir sonraki turda yakalanır
+            versions = watch()
+            current = await load_slots()
+            if current is None:
+                return
+            current_set, sent_set = set(current), set(sent)
+            added = [t for t in current if t not in sent_set]
+            removed = [t for t in sent if t not in current_set]
+            if added or removed:
+                idle = 0.0
+                yield sse_event("diff", {"date": subscription.day, "added": added, "removed": removed})
+            sent = current
+    finally:
+        slot_changes.unsubscribe(subscription)
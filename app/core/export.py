@@ -0,0 +1,44 @@
+import csv
+import io
+import json
+from datetime import date, datetime, time
+from typing import Iterable, Iterator, Sequence
+
+# Desteklenen dışa aktarma biçimleri -> içerik tipi
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return value
+
+
+def csv_chunks(columns: Sequence[str], batches: Iterable[Sequence[tuple]]) -> Iterator[str]:
+    """One chunk per batch; the header goes out before the first row is fetched"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue()
+    for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_plain(v) for v in row] for row in rows)
+        yield buffer.getvalue()
+
+
+def ndjson_chunks(columns: Sequence[str], batches: Iterable[Sequence[tuple]]) -> Iterator[str]:
+    for rows in batches:
+        yield "".join(
+            json.dumps({name: _plain(v) for name, v in zip(columns, row)}) + "\n"
+            for row in rows
+        )
+
+
+EXPORT_WRITERS = {
+    "csv": csv_chunks,
+    "ndjson": ndjson_chunks,
+}
@@ -0,0 +1,35 @@
+from typing import Any, List, Optional, Sequence, Type
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+
+
+def schema_columns(schema: Type[BaseModel], model: Any) -> List[Any]:
+    """Model columns for every field of `schema`, in schema field order"""
+    return [getattr(model, name) for name in schema.__fields__]
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+
+def fast_json_response(
+    rows: Sequence[Sequence[Any]],
+    schema: Type[BaseModel],
+    response: Optional[Response] = None
+) -> FastJSONResponse:
+    """
+    Encode row tuples selected with schema_columns() straight to JSON, skipping ORM
+    objects and pydantic validation. Output matches the schema's regular response.
+    Headers set on the handler's `response` parameter (e.g. the next cursor) are kept.
+    """
+    fields = list(schema.__fields__)
+    content = orjson.dumps([dict(zip(fields, row)) for row in rows])
+    headers = None
+    if response is not None:
+        headers = {
+            key: value for key, value in response.headers.items()
+            if key not in ("content-length", "content-type")
+        }
+    return FastJSONResponse(content=content, headers=headers)
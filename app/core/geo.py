@@ -0,0 +1,118 @@
+import math
+from typing import List, Optional, Tuple
+
+# Geohash alfabesi (a, i, l, o yok)
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_DECODE = {char: index for index, char in enumerate(BASE32)}
+
+# Berber konumları bu hassasiyetle saklanır (~4.8 m x 4.8 m)
+GEOHASH_PRECISION = 9
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def encode(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        # Çift bitler boylamı, tek bitler enlemi böler
+        interval, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        if coordinate >= middle:
+            value = (value << 1) | 1
+            interval[0] = middle
+        else:
+            value <<= 1
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = 0
+            value = 0
+    return "".join(chars)
+
+
+def prefix_upper_bound(prefix: str) -> Optional[str]:
+    """
+    Smallest geohash after every hash starting with `prefix` ("u4pr" -> "u4ps",
+    "u4pz" -> "u4q"), so prefix <= geohash < bound selects the cell. Only base32
+    characters are compared, which sort the same under any collation. None when
+    no bound exists ("zz").
+    """
+    while prefix:
+        index = _DECODE[prefix[-1]]
+        if index + 1 < len(BASE32):
+            return prefix[:-1] + BASE32[index + 1]
+        prefix = prefix[:-1]
+    return None
+
+
+def bounds(geohash: str) -> Tuple[float, float, float, float]:
+    """(min_lat, min_lon, max_lat, max_lon) of a geohash cell"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = _DECODE[char]
+        for shift in range(4, -1, -1):
+            interval = lon_range if even else lat_range
+            middle = (interval[0] + interval[1]) / 2
+            if (value >> shift) & 1:
+                interval[0] = middle
+            else:
+                interval[1] = middle
+            even = not even
+    return lat_range[0], lon_range[0], lat_range[1], lon_range[1]
+
+
+def neighbors(geohash: str) -> List[str]:
+    """The cell itself and its (up to) 8 neighbours; wraps at the antimeridian"""
+    min_lat, min_lon, max_lat, max_lon = bounds(geohash)
+    height = max_lat - min_lat
+    width = max_lon - min_lon
+    center_lat = (min_lat + max_lat) / 2
+    center_lon = (min_lon + max_lon) / 2
+    cells = []
+    for d_lat in (-1, 0, 1):
+        latitude = center_lat + d_lat * height
+        if not -90 < latitude < 90:
+            continue
+        for d_lon in (-1, 0, 1):
+            longitude = (center_lon + d_lon * width + 180) % 360 - 180
+            cell = encode(latitude, longitude, len(geohash))
+            if cell not in cells:
+                cells.append(cell)
+    return cells
+
+
+def cell_size_km(precision: int, latitude: float) -> Tuple[float, float]:
+    """Approximate (height, width) of a cell at `latitude`"""
+    lat_bits = (5 * precision) // 2
+    lon_bits = 5 * precision - lat_bits
+    height = 180.0 / 2 ** lat_bits * 111.32
+    width = 360.0 / 2 ** lon_bits * 111.32 * math.cos(math.radians(latitude))
+    return height, width
+
+
+def precision_for_radius(radius_km: float, latitude: float) -> int:
+    """
+    Finest precision whose cells are at least `radius_km` across, so the circle
+    around any point is covered by that point's cell and its 8 neighbours.
+    """
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        if min(cell_size_km(precision, latitude)) >= radius_km:
+            return precision
+    return 1
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
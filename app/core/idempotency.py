@@ -0,0 +1,275 @@
+import hashlib
+import itertools
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Protocol, Tuple
+
+import orjson
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import Counter
+from app.models.models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+# begin() sonuçları
+STARTED = "started"
+COMPLETED = "completed"
+IN_PROGRESS = "in_progress"
+MISMATCH = "mismatch"
+
+# Tekrar oynatılan yanıtta taşınmayan başlıklar (istek anına özgü)
+_NOT_STORED_HEADERS = {b"set-cookie", b"date", b"server"}
+
+# Veritabanı deposunda süresi dolmuş kayıtlar her N başlangıçta bir silinir
+PURGE_EVERY = 1000
+
+idempotent_requests = Counter("idempotent_requests_total", "Requests carrying an Idempotency-Key", ("outcome",))
+
+
+@dataclass
+class StoredResponse:
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+
+
+def request_key(method: str, path: str, identity: str, idempotency_key: str) -> str:
+    """Keys are scoped per route and client, so one client cannot replay another's response"""
+    return hashlib.sha256(f"{method} {path}\n{identity}\n{idempotency_key}".encode()).hexdigest()
+
+
+def fingerprint(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+def is_replayable(status: int, headers: List[Tuple[bytes, bytes]]) -> bool:
+    # 5xx, 401, 429 ve Retry-After taşıyan yanıtlar (ör. meşgul berber 409) geçicidir:
+    # anahtar bırakılır, tekrar deneme isteği yeniden çalıştırır
+    if status >= 500 or status in (401, 429):
+        return False
+    return not any(name.lower() == b"retry-after" for name, _ in headers)
+
+
+def storable_headers(headers: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+    return [(name, value) for name, value in headers if name.lower() not in _NOT_STORED_HEADERS]
+
+
+class IdempotencyStore(Protocol):
+    def begin(self, key: str, fingerprint: str, now: datetime) -> Tuple[str, Optional[StoredResponse]]:
+        """
+        Claim `key` for execution (STARTED) or report its state: COMPLETED with the
+        stored response, IN_PROGRESS while another request holds it, MISMATCH when
+        the key was used with a different request body.
+        """
+
+    def get(self, key: str, now: datetime) -> Tuple[Optional[str], Optional[StoredResponse]]:
+        """(state, response) without claiming; state None if the key is free"""
+
+    def complete(self, key: str, response: StoredResponse, now: datetime) -> None:
+        """Store the response for IDEMPOTENCY_TTL seconds"""
+
+    def release(self, key: str) -> None:
+        """Give up an in-flight claim (the handler failed); the next retry executes again"""
+
+
+@dataclass
+class _Entry:
+    fingerprint: str
+    locked_until: Optional[datetime]
+    expires_at: datetime
+    response: Optional[StoredResponse] = None
+
+
+class MemoryIdempotencyStore:
+    """Per-process store (single worker / development); duplicates on other workers are not seen"""
+
+    def __init__(self, maxsize: int = 100000):
+        self.maxsize = maxsize
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+
+    def _state(self, entry: Optional[_Entry], fingerprint: Optional[str], now: datetime):
+        if entry is None or entry.expires_at <= now:
+            return None, None
+        if fingerprint is not None and entry.fingerprint != fingerprint:
+            return MISMATCH, None
+        if entry.response is not None:
+            return COMPLETED, entry.response
+        if entry.locked_until is not None and entry.locked_until > now:
+            return IN_PROGRESS, None
+        # Çalıştıran süreç öldü: kilit süresi doldu, anahtar yeniden alınabilir
+        return None, None
+
+    def begin(self, key: str, fingerprint: str, now: datetime) -> Tuple[str, Optional[StoredResponse]]:
+        with self._lock:
+            state, response = self._state(self._entries.get(key), fingerprint, now)
+            if state is not None:
+                return state, response
+            self._entries[key] = _Entry(
+                fingerprint=fingerprint,
+                locked_until=now + timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT),
+                expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_TTL),
+            )
+            if len(self._entries) > self.maxsize:
+                self._prune(now)
+            return STARTED, None
+
+    def get(self, key: str, now: datetime) -> Tuple[Optional[str], Optional[StoredResponse]]:
+        with self._lock:
+            return self._state(self._entries.get(key), None, now)
+
+    def complete(self, key: str, response: StoredResponse, now: datetime) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.response = response
+                entry.locked_until = None
+                entry.expires_at = now + timedelta(seconds=settings.IDEMPOTENCY_TTL)
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.response is None:
+                del self._entries[key]
+
+    def _prune(self, now: datetime) -> None:
+        expired = [key for key, entry in self._entries.items() if entry.expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+        # Uzun TTL ile hâlâ fazlaysa en eski kayıtlar atılır (dict ekleme sırası = begin sırası);
+        # çalışmakta olan isteklerin anahtarları korunur
+        excess = len(self._entries) - self.maxsize
+        if excess > 0:
+            oldest = [
+                key for key, entry in self._entries.items()
+                if entry.response is not None or entry.locked_until is None or entry.locked_until <= now
+            ][:excess]
+            for key in oldest:
+                del self._entries[key]
+
+
+def _encode_headers(headers: List[Tuple[bytes, bytes]]) -> str:
+    return orjson.dumps([[name.decode("latin-1"), value.decode("latin-1")] for name, value in headers]).decode()
+
+
+def _decode_headers(data: str) -> List[Tuple[bytes, bytes]]:
+    return [(name.encode("latin-1"), value.encode("latin-1")) for name, value in orjson.loads(data)]
+
+
+class DatabaseIdempotencyStore:
+    """
+    Keys in the idempotency_keys table, shared by every worker and instance.
+    The primary key makes the claim atomic: the first INSERT wins, duplicates
+    see the row and wait for its response.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session]):
+        self.session_factory = session_factory
+        self._begins = itertools.count(1)
+
+    def _state(self, row: Optional[IdempotencyKey], fingerprint: Optional[str], now: datetime):
+        if row is None or row.expires_at <= now:
+            return None, None
+        if fingerprint is not None and row.fingerprint != fingerprint:
+            return MISMATCH, None
+        if row.status_code is not None:
+            return COMPLETED, StoredResponse(row.status_code, _decode_headers(row.response_headers), row.response_body)
+        if row.locked_until is not None and row.locked_until > now:
+            return IN_PROGRESS, None
+        return None, None
+
+    def begin(self, key: str, fingerprint: str, now: datetime) -> Tuple[str, Optional[StoredResponse]]:
+        if next(self._begins) % PURGE_EVERY == 0:
+            self.purge(now)
+        locked_until = now + timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT)
+        with self.session_factory() as db:
+            db.add(IdempotencyKey(
+                key=key,
+                fingerprint=fingerprint,
+                locked_until=locked_until,
+                expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_TTL),
+            ))
+            try:
+                db.commit()
+                return STARTED, None
+            except IntegrityError:
+                db.rollback()
+
+            row = db.get(IdempotencyKey, key)
+            if row is None:
+                # Sahibi anahtarı az önce bıraktı; çağıran bekleyip yeniden dener
+                return IN_PROGRESS, None
+            state, response = self._state(row, fingerprint, now)
+            if state is not None:
+                return state, response
+            # Süresi dolmuş ya da sahibi ölmüş kayıt: yalnızca bir istek devralabilir (koşullu UPDATE)
+            result = db.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.key == key, IdempotencyKey.locked_until == row.locked_until,
+                       IdempotencyKey.expires_at == row.expires_at)
+                .values(
+                    fingerprint=fingerprint,
+                    status_code=None,
+                    response_headers=None,
+                    response_body=None,
+                    locked_until=locked_until,
+                    expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_TTL),
+                )
+            )
+            db.commit()
+            return (STARTED, None) if result.rowcount == 1 else (IN_PROGRESS, None)
+
+    def get(self, key: str, now: datetime) -> Tuple[Optional[str], Optional[StoredResponse]]:
+        with self.session_factory() as db:
+            return self._state(db.get(IdempotencyKey, key), None, now)
+
+    def complete(self, key: str, response: StoredResponse, now: datetime) -> None:
+        with self.session_factory() as db:
+            db.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.key == key)
+                .values(
+                    status_code=response.status,
+                    response_headers=_encode_headers(response.headers),
+                    response_body=response.body,
+                    locked_until=None,
+                    expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_TTL),
+                )
+            )
+            db.commit()
+
+    def release(self, key: str) -> None:
+        with self.session_factory() as db:
+            db.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.status_code.is_(None)))
+            db.commit()
+
+    def purge(self, now: datetime) -> int:
+        """Delete expired keys"""
+        with self.session_factory() as db:
+            result = db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= now))
+            db.commit()
+            return result.rowcount
+
+
+def build_store(backend: str) -> IdempotencyStore:
+    if backend == "database":
+        return DatabaseIdempotencyStore(SessionLocal)
+    if backend == "memory":
+        return MemoryIdempotencyStore()
+    raise ValueError(f"Unknown IDEMPOTENCY_BACKEND: {backend}")
+
+
+idempotency_store = build_store(settings.IDEMPOTENCY_BACKEND)
+
+
+def set_store(store: IdempotencyStore) -> None:
+    global idempotency_store
+    idempotency_store = store
@@ -0,0 +1,151 @@
+import asyncio
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+# pg_advisory_xact_lock(namespace, key): randevu yazmaları için ayrılmış ad alanı
+BOOKING_LOCK_NAMESPACE = 1
+
+# lock_timeout aşıldığında Postgres'in döndürdüğü hata kodu (lock_not_available)
+LOCK_NOT_AVAILABLE = "55P03"
+
+# SQLite için süreç içi yedek: berber başına tek kilit (global değil), senkron ve async yollar aynı kilidi alır
+_thread_locks: Dict[int, threading.Lock] = {}
+_guard = threading.Lock()
+
+
+class BookingConflictError(Exception):
+    """The requested time overlaps a confirmed booking of the same barber"""
+
+
+class BarberBusyError(BookingConflictError):
+    """Transient conflict (write lock timeout, concurrent change): retrying may succeed"""
+
+
+def conflict_headers(error: BookingConflictError) -> Optional[Dict[str, str]]:
+    # Geçici çakışmalar Retry-After taşır; Idempotency-Key yanıtı saklanmaz
+    return {"Retry-After": "1"} if isinstance(error, BarberBusyError) else None
+
+
+def _thread_lock(barber_id: int) -> threading.Lock:
+    with _guard:
+        return _thread_locks.setdefault(barber_id, threading.Lock())
+
+
+def _lock_timeout() -> float:
+    # Postgres lock_timeout ile aynı bekleme süresi
+    return settings.BOOKING_LOCK_TIMEOUT_MS / 1000
+
+
+def _busy() -> BarberBusyError:
+    return BarberBusyError("Barber schedule is busy, please retry")
+
+
+async def _acquire_async(lock: threading.Lock) -> bool:
+    """
+    Acquire a thread lock without blocking the event loop. Uncontended locks are
+    taken inline; otherwise a worker thread waits for it. If the caller is
+    cancelled meanwhile, the lock is released as soon as the thread gets it.
+    """
+    if lock.acquire(blocking=False):
+        return True
+    acquiring = asyncio.ensure_future(run_in_threadpool(lock.acquire, True, _lock_timeout()))
+    try:
+        return await asyncio.shield(acquiring)
+    except asyncio.CancelledError:
+        def release_if_acquired(future: "asyncio.Future[bool]") -> None:
+            if not future.cancelled() and future.exception() is None and future.result():
+                lock.release()
+        acquiring.add_done_callback(release_if_acquired)
+        raise
+
+
+def _advisory_lock_statements():
+    return (
+        text(f"SET LOCAL lock_timeout = {int(settings.BOOKING_LOCK_TIMEOUT_MS)}"),
+        text("SELECT pg_advisory_xact_lock(:namespace, :barber_id)"),
+    )
+
+
+def _sqlstate(error: DBAPIError):
+    orig = error.orig
+    return getattr(orig, "pgcode", None) or getattr(orig, "sqlstate", None)
+
+
+def is_lock_timeout(error: DBAPIError) -> bool:
+    """
+    lock_timeout expired (55P03). psycopg2 raises it as OperationalError, asyncpg
+    reaches SQLAlchemy as a plain DBAPIError, so the code is checked instead.
+    """
+    return _sqlstate(error) == LOCK_NOT_AVAILABLE
+
+
+@contextmanager
+def barber_write_lock(db: Session, barber_id: int):
+    """
+    Serialize booking writes of one barber. On Postgres this is a transaction-scoped
+    advisory lock (released by the commit inside the block); elsewhere a per-barber
+    process-local lock shared with barber_write_lock_async. Either way, waiting
+    longer than BOOKING_LOCK_TIMEOUT_MS raises BarberBusyError. The database
+    constraint/trigger remains the final guard.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        set_timeout, lock = _advisory_lock_statements()
+        try:
+            db.execute(set_timeout)
+            db.execute(lock, {"namespace": BOOKING_LOCK_NAMESPACE, "barber_id": barber_id})
+        except DBAPIError as e:
+            if not is_lock_timeout(e):
+                raise
+            db.rollback()
+            raise _busy() from e
+        yield
+        return
+
+    lock = _thread_lock(barber_id)
+    if not lock.acquire(timeout=_lock_timeout()):
+        db.rollback()
+        raise _busy()
+    try:
+        yield
+    finally:
+        lock.release()
+
+
+@asynccontextmanager
+async def barber_write_lock_async(db: AsyncSession, barber_id: int):
+    """barber_write_lock for AsyncSession"""
+    if db.bind.dialect.name == "postgresql":
+        set_timeout, lock = _advisory_lock_statements()
+        try:
+            await db.execute(set_timeout)
+            await db.execute(lock, {"namespace": BOOKING_LOCK_NAMESPACE, "barber_id": barber_id})
+        except DBAPIError as e:
+            if not is_lock_timeout(e):
+                raise
+            await db.rollback()
+            raise _busy() from e
+        yield
+        return
+
+    lock = _thread_lock(barber_id)
+    if not await _acquire_async(lock):
+        await db.rollback()
+        raise _busy()
+    try:
+        yield
+    finally:
+        lock.release()
+
+
+def is_overlap_violation(error: IntegrityError) -> bool:
+    """Postgres exclusion constraint (23P01) or the SQLite no-overlap trigger"""
+    return _sqlstate(error) == "23P01" or "booking_overlap" in str(error.orig)
@@ -0,0 +1,54 @@
+import logging
+import sys
+
+import orjson
+
+from app.core.config import settings
+
+# LogRecord'un kendi alanları; geri kalanlar logger.x(..., extra={...}) ile verilen bağlamdır
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+def _context(record: logging.LogRecord) -> dict:
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_FIELDS}
+
+
+class StructuredFormatter(logging.Formatter):
+    """One line per record: either text with key=value context or a JSON object"""
+
+    def __init__(self, as_json: bool = False):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+        self.as_json = as_json
+
+    def format(self, record: logging.LogRecord) -> str:
+        context = _context(record)
+        if not self.as_json:
+            line = super().format(record)
+            if context:
+                line += " " + " ".join(f"{key}={value!r}" for key, value in context.items())
+            return line
+
+        payload = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **context,
+        }
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return orjson.dumps(payload, default=str).decode()
+
+
+def configure_logging() -> None:
+    """
+    Install a single stderr handler on the root logger. LOG_LEVEL applies to the
+    application's loggers (app.*); libraries stay at WARNING. Records below the
+    level are rejected by the logger's level check before any formatting happens.
+    """
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(StructuredFormatter(as_json=settings.LOG_FORMAT.lower() == "json"))
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(logging.WARNING)
+    logging.getLogger("app").setLevel(settings.LOG_LEVEL.upper())
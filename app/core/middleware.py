@@ -0,0 +1,392 @@
+import asyncio
+import hashlib
+import logging
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import idempotency
+from app.core.config import settings
+from app.core.database import track_queries
+from app.core.metrics import http_request_duration, http_requests_in_progress, http_responses
+from app.core.ratelimit import client_identity, rate_limited, rate_limiter
+from app.core.replicas import pin_to_primary, pin_to_primary_reset, primary_pins
+from app.core.profiling import (
+    PROFILE_HEADER,
+    PROFILE_ID_HEADER,
+    PROFILES_PATH,
+    SamplingProfiler,
+    new_profile_id,
+    profiling_authorized,
+    store_profile,
+)
+
+logger = logging.getLogger(__name__)
+
+# Aynı Idempotency-Key ile çalışan ilk isteğin sonucunu yoklama aralığı (saniye)
+IDEMPOTENCY_POLL_INTERVAL = 0.05
+
+
+class QueryStatsMiddleware:
+    """Per-request query count, DB time and slowest statement; flags likely N+1 patterns"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            async def send_with_stats(message: Message) -> None:
+                if message["type"] == "http.response.start" and settings.SQL_STATS_HEADERS:
+                    headers = MutableHeaders(scope=message)
+                    headers["X-DB-Query-Count"] = str(stats.count)
+                    headers["X-DB-Time-Ms"] = f"{stats.total_time * 1000:.2f}"
+                    headers["X-DB-Slowest-Ms"] = f"{stats.slowest_time * 1000:.2f}"
+                await send(message)
+
+            await self.app(scope, receive, send_with_stats)
+
+        route = f"{scope['method']} {scope['path']}"
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "%s: %d queries, %.2f ms DB time, slowest %.2f ms: %s",
+                route, stats.count, stats.total_time * 1000,
+                stats.slowest_time * 1000, stats.slowest_statement
+            )
+        for shape, count in stats.repeated_statements(settings.SQL_N_PLUS_ONE_THRESHOLD):
+            logger.warning("%s: possible N+1, statement ran %d times: %s", route, count, shape)
+
+
+class MetricsMiddleware:
+    """
+    Request latency histogram, status counter and in-flight gauge for /metrics.
+    Routes are labelled by their template (/barbers/{barber_id}), never the raw path,
+    so label cardinality stays bounded.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._route_paths: Dict[Callable, str] = {}
+
+    def _route_label(self, scope: Scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        path = self._route_paths.get(endpoint)
+        if path is None:
+            # Router, eşleşen endpoint'i scope'a yazar; şablonu uygulamanın rotalarından bul
+            for route in getattr(scope.get("app"), "routes", ()):
+                if getattr(route, "endpoint", None) is not None:
+                    self._route_paths[route.endpoint] = route.path
+            path = self._route_paths.get(endpoint, "unmatched")
+        return path
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_progress.inc(method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = self._route_label(scope)
+            http_request_duration.observe(time.perf_counter() - started, method, route)
+            http_responses.inc(method, route, str(status_code))
+            http_requests_in_progress.dec(method)
+
+
+class ProfilingMiddleware:
+    """
+    Samples stacks while a single request runs when it carries a valid X-Profile
+    header. The folded-stack profile is served at /debug/profiles/{id}; the id is
+    returned in the X-Profile-Id response header.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        token: Optional[str] = None
+        if scope["type"] == "http" and settings.PROFILING_TOKEN and not scope["path"].startswith(PROFILES_PATH):
+            token = Headers(scope=scope).get(PROFILE_HEADER)
+        if not profiling_authorized(token):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = new_profile_id()
+
+        async def send_with_profile_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[PROFILE_ID_HEADER] = profile_id
+            await send(message)
+
+        profiler = SamplingProfiler(settings.PROFILING_INTERVAL_MS / 1000)
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profiler.stop()
+            store_profile(profile_id, profiler.folded())
+            logger.info("profiled %s %s: %d samples, id %s",
+                        scope["method"], scope["path"], profiler.samples, profile_id)
+
+
+# Bu metotlar veri değiştirmez; başarılı diğer istekler yazma sayılır
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+PRIMARY_PIN_COOKIE = "db_primary_until"
+
+
+def _client_key(scope: Scope, headers: Headers) -> str:
+    # Kimliği doğrulanmış istemci token'ıyla, diğerleri IP adresiyle tanınır
+    authorization = headers.get("authorization")
+    if authorization:
+        return "auth:" + hashlib.sha256(authorization.encode()).hexdigest()
+    client = scope.get("client")
+    return "ip:" + (client[0] if client else "unknown")
+
+
+class ReadYourWritesMiddleware:
+    """
+    Pins a client's reads to the primary database for READ_YOUR_WRITES_SECONDS
+    after one of its own successful writes. The pin is kept in process memory
+    and mirrored in a cookie so it also holds when the next request hits
+    another worker.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    def _pinned(self, scope: Scope, headers: Headers, key: str) -> bool:
+        if primary_pins.get(key):
+            return True
+        cookie = self._cookie(headers)
+        try:
+            return cookie is not None and float(cookie) > time.time()
+        except ValueError:
+            return False
+
+    @staticmethod
+    def _cookie(headers: Headers) -> Optional[str]:
+        for part in headers.get("cookie", "").split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == PRIMARY_PIN_COOKIE:
+                return value
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.DATABASE_REPLICA_URLS:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        key = _client_key(scope, headers)
+        is_write = scope["method"] not in SAFE_METHODS
+
+        async def send_with_pin(message: Message) -> None:
+            if message["type"] == "http.response.start" and is_write and message["status"] < 400:
+                window = settings.READ_YOUR_WRITES_SECONDS
+                primary_pins.set(key, True)
+                MutableHeaders(scope=message).append(
+                    "Set-Cookie",
+                    f"{PRIMARY_PIN_COOKIE}={time.time() + window:.0f}; Max-Age={window:.0f}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+            await send(message)
+
+        token = pin_to_primary(is_write or self._pinned(scope, headers, key))
+        try:
+            await self.app(scope, receive, send_with_pin)
+        finally:
+            pin_to_primary_reset(token)
+
+
+class RateLimitMiddleware:
+    """
+    Admission control for expensive routes (RATE_LIMIT_RULES). Runs before routing,
+    so rejected requests never reach a dependency or a DB session:
+    over the per-client token bucket -> 429, over the route's concurrency cap -> 503,
+    both with Retry-After.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        rule = None
+        if scope["type"] == "http" and settings.RATE_LIMIT_ENABLED:
+            rule = rate_limiter.match(scope["method"], scope["path"])
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        identity = client_identity(scope, Headers(scope=scope).get("authorization"), rule.rule.per)
+        allowed, retry_after = rate_limiter.check(rule, identity)
+        if not allowed:
+            rate_limited.inc(rule.path, "rate")
+            response = JSONResponse(
+                {"detail": "Too many requests, please retry later"},
+                status_code=429,
+                headers={"Retry-After": str(retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        if not rule.acquire():
+            rate_limited.inc(rule.path, "concurrency")
+            response = JSONResponse(
+                {"detail": "Service is busy, please retry"},
+                status_code=503,
+                headers={"Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            rule.release()
+
+
+class IdempotencyMiddleware:
+    """
+    Idempotency-Key support for IDEMPOTENCY_ROUTES. The first request with a key
+    runs and its response is stored for IDEMPOTENCY_TTL; retries get the stored
+    response (Idempotent-Replayed: true) without running the handler again.
+    A duplicate that arrives while the first is still running waits for it.
+    Reusing a key with a different body is rejected with 422.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.routes = {tuple(route.split(" ", 1)) for route in settings.IDEMPOTENCY_ROUTES}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        key_header = None
+        if scope["type"] == "http" and settings.IDEMPOTENCY_ENABLED and (scope["method"], scope["path"]) in self.routes:
+            key_header = Headers(scope=scope).get(idempotency.IDEMPOTENCY_HEADER)
+        if not key_header:
+            await self.app(scope, receive, send)
+            return
+        if len(key_header) > idempotency.MAX_KEY_LENGTH:
+            response = JSONResponse({"detail": "Idempotency-Key is too long"}, status_code=400)
+            await response(scope, receive, send)
+            return
+
+        # Parmak izi için gövde okunur, ardından uygulamaya aynen yeniden verilir
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+        identity = client_identity(scope, Headers(scope=scope).get("authorization"), "user")
+        key = idempotency.request_key(scope["method"], scope["path"], identity, key_header)
+        state, stored = await self._claim(key, idempotency.fingerprint(body))
+
+        if state == idempotency.COMPLETED:
+            idempotency.idempotent_requests.inc("replayed")
+            await self._replay(stored, send)
+            return
+        if state == idempotency.MISMATCH:
+            idempotency.idempotent_requests.inc("mismatch")
+            response = JSONResponse(
+                {"detail": "Idempotency-Key was already used with a different request"},
+                status_code=422,
+            )
+            await response(scope, receive, send)
+            return
+        if state == idempotency.IN_PROGRESS:
+            idempotency.idempotent_requests.inc("timeout")
+            response = JSONResponse(
+                {"detail": "A request with this Idempotency-Key is still in progress"},
+                status_code=409,
+                headers={"Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+            return
+
+        idempotency.idempotent_requests.inc("executed")
+        await self._execute(scope, body, receive, send, key)
+
+    async def _claim(self, key: str, fingerprint: str):
+        """begin(), waiting while another request holds the key"""
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+        while True:
+            state, stored = await run_in_threadpool(idempotency.idempotency_store.begin, key, fingerprint, datetime.utcnow())
+            if state != idempotency.IN_PROGRESS:
+                return state, stored
+            # İlk istek bitene (ya da anahtarı bırakana) kadar bekle
+            while True:
+                if time.monotonic() >= deadline:
+                    return idempotency.IN_PROGRESS, None
+                await asyncio.sleep(IDEMPOTENCY_POLL_INTERVAL)
+                state, stored = await run_in_threadpool(idempotency.idempotency_store.get, key, datetime.utcnow())
+                if state == idempotency.COMPLETED:
+                    return state, stored
+                if state is None:
+                    break
+
+    async def _replay(self, stored: "idempotency.StoredResponse", send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": stored.status,
+            "headers": stored.headers + [(idempotency.REPLAYED_HEADER.lower().encode(), b"true")],
+        })
+        await send({"type": "http.response.body", "body": stored.body})
+
+    async def _execute(self, scope: Scope, body: bytes, receive: Receive, send: Send, key: str) -> None:
+        body_sent = False
+
+        async def replay_receive() -> Message:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # Gövde zaten okundu: sonraki mesaj yalnızca bağlantı kopması olabilir
+            return await receive()
+
+        status = None
+        headers = []
+        chunks = []
+
+        async def send_and_record(message: Message) -> None:
+            nonlocal status, headers
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = idempotency.storable_headers(list(message.get("headers", [])))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        completed = False
+        try:
+            await self.app(scope, replay_receive, send_and_record)
+            if status is not None and idempotency.is_replayable(status, headers):
+                response = idempotency.StoredResponse(status, headers, b"".join(chunks))
+                await run_in_threadpool(idempotency.idempotency_store.complete, key, response, datetime.utcnow())
+                completed = True
+        finally:
+            if not completed:
+                # Hata ya da geçici yanıt: sonraki deneme isteği yeniden çalıştırır
+                await asyncio.shield(run_in_threadpool(idempotency.idempotency_store.release, key))
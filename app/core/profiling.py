@@ -0,0 +1,97 @@
+import hmac
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Optional
+
+from app.core.config import settings
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+# Profil okuma isteklerinin kendisi profillenmez
+PROFILES_PATH = "/debug/profiles"
+
+# Son profiller (id -> folded stack metni); bellek sınırlı tutulur
+_profiles: "OrderedDict[str, str]" = OrderedDict()
+_profiles_lock = threading.Lock()
+
+
+def profiling_authorized(token: Optional[str]) -> bool:
+    """PROFILING_TOKEN must be configured and match; profiling is off otherwise"""
+    expected = settings.PROFILING_TOKEN
+    return bool(expected and token) and hmac.compare_digest(token.encode(), expected.encode())
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Samples the Python stacks of all threads every `interval` seconds with
+    sys._current_frames() and aggregates them as folded stacks
+    ("thread;outer;...;inner count"), the input format of flamegraph.pl and speedscope.
+    Every thread is sampled, so concurrent requests show up in the same profile.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self.started_at = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        names = {}
+        while True:
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+            if self._stop.wait(self.interval):
+                break
+
+    def folded(self) -> str:
+        header = (
+            f"# samples={self.samples} interval_ms={self.interval * 1000:g} "
+            f"duration_ms={self.duration * 1000:.1f}\n"
+        )
+        return header + "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def new_profile_id() -> str:
+    return uuid.uuid4().hex
+
+
+def store_profile(profile_id: str, folded: str) -> None:
+    with _profiles_lock:
+        _profiles[profile_id] = folded
+        while len(_profiles) > settings.PROFILING_MAX_STORED:
+            _profiles.popitem(last=False)
+
+
+def get_profile(profile_id: str) -> Optional[str]:
+    with _profiles_lock:
+        return _profiles.get(profile_id)
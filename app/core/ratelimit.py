@@ -0,0 +1,197 @@
+import math
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Pattern, Protocol, Tuple
+
+from fastapi import HTTPException
+from starlette.routing import compile_path
+
+from app.core.config import RateLimitRule, settings
+from app.core.metrics import Counter
+from app.core.security import verify_token
+
+_BEARER_RE = re.compile(r"^Bearer\s+(\S+)$", re.IGNORECASE)
+
+# Bellek içi kova sayısı bu sınırı aşınca dolmuş (bekleyen tüketimi olmayan) kovalar atılır
+MAX_MEMORY_BUCKETS = 100000
+# Paylaşımlı depoda CAS çakışmasında en fazla deneme
+MAX_CAS_ATTEMPTS = 5
+
+rate_limited = Counter("rate_limited_total", "Requests rejected by admission control", ("route", "reason"))
+
+
+def _refill(tokens: float, updated: float, now: float, rate: float, burst: int) -> float:
+    return min(float(burst), tokens + max(0.0, now - updated) * rate)
+
+
+def _take(tokens: float, rate: float) -> Tuple[bool, float, float]:
+    """(allowed, remaining tokens, seconds until one token is available)"""
+    if tokens >= 1:
+        return True, tokens - 1, 0.0
+    return False, tokens, (1 - tokens) / rate
+
+
+class BucketStore(Protocol):
+    def take(self, key: str, rate: float, burst: int, now: float) -> Tuple[bool, float]:
+        """Consume one token; returns (allowed, retry_after_seconds)"""
+
+
+class MemoryBucketStore:
+    """Token buckets in process memory (per worker)"""
+
+    def __init__(self):
+        # anahtar -> (jeton, son güncelleme, kovanın yeniden dolacağı an)
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: float, burst: int, now: float) -> Tuple[bool, float]:
+        with self._lock:
+            tokens, updated, _ = self._buckets.get(key, (float(burst), now, now))
+            allowed, tokens, retry_after = _take(_refill(tokens, updated, now, rate, burst), rate)
+            self._buckets[key] = (tokens, now, now + (burst - tokens) / rate)
+            if len(self._buckets) > MAX_MEMORY_BUCKETS:
+                self._prune(now)
+            return allowed, retry_after
+
+    def _prune(self, now: float) -> None:
+        # Tamamen dolmuş kova, hiç kayıt olmamasıyla aynı davranır
+        full = [key for key, (_, _, full_at) in self._buckets.items() if full_at <= now]
+        for key in full:
+            del self._buckets[key]
+
+
+class CASClient(Protocol):
+    """
+    Minimal compare-and-set key-value protocol (memcached gets/cas, Redis
+    WATCH/MULTI or a database row with a version column can implement it).
+    """
+
+    def gets(self, key: str) -> Tuple[Optional[str], Optional[int]]:
+        """(value, version) or (None, None) if missing"""
+
+    def cas(self, key: str, value: str, version: Optional[int], ttl: float) -> bool:
+        """Store if the version is unchanged (None = key must not exist)"""
+
+
+class SharedBucketStore:
+    """Token buckets in a shared store so every worker and instance sees the same budget"""
+
+    def __init__(self, client: CASClient):
+        self.client = client
+
+    def take(self, key: str, rate: float, burst: int, now: float) -> Tuple[bool, float]:
+        # Kova dolana kadar geçen süre; sonrasında kayıt gereksizdir
+        ttl = burst / rate
+        for _ in range(MAX_CAS_ATTEMPTS):
+            value, version = self.client.gets(key)
+            if value is None:
+                tokens, updated = float(burst), now
+            else:
+                stored_tokens, stored_updated = value.split(":")
+                tokens, updated = float(stored_tokens), float(stored_updated)
+            allowed, tokens, retry_after = _take(_refill(tokens, updated, now, rate, burst), rate)
+            if self.client.cas(key, f"{tokens:.6f}:{now:.6f}", version, ttl):
+                return allowed, retry_after
+        # Yoğun çekişme: isteği reddetmek yerine kabul et (depo yalnızca koruma amaçlı)
+        return True, 0.0
+
+
+class FakeCASClient:
+    """In-process stand-in for a shared CAS store (local development and tests)"""
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[str, int, float]] = {}
+        self._lock = threading.Lock()
+        self._versions = 0
+
+    def gets(self, key: str) -> Tuple[Optional[str], Optional[int]]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[2] <= time.monotonic():
+                return None, None
+            return entry[0], entry[1]
+
+    def cas(self, key: str, value: str, version: Optional[int], ttl: float) -> bool:
+        with self._lock:
+            entry = self._data.get(key)
+            current = entry[1] if entry is not None and entry[2] > time.monotonic() else None
+            if current != version:
+                return False
+            self._versions += 1
+            self._data[key] = (value, self._versions, time.monotonic() + ttl)
+            return True
+
+
+class CompiledRule:
+    def __init__(self, rule: RateLimitRule):
+        method, _, path = rule.route.partition(" ")
+        self.rule = rule
+        self.method = method.upper()
+        self.path = path
+        self.regex: Pattern = compile_path(path)[0]
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def matches(self, method: str, path: str) -> bool:
+        return method == self.method and self.regex.match(path) is not None
+
+    def acquire(self) -> bool:
+        limit = self.rule.concurrency
+        with self._lock:
+            if limit is not None and self.in_flight >= limit:
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+
+class RateLimiter:
+    def __init__(self, rules: List[RateLimitRule], store: BucketStore):
+        self.rules = [CompiledRule(rule) for rule in rules]
+        self.store = store
+
+    def match(self, method: str, path: str) -> Optional[CompiledRule]:
+        for rule in self.rules:
+            if rule.matches(method, path):
+                return rule
+        return None
+
+    def check(self, compiled: CompiledRule, client: str) -> Tuple[bool, int]:
+        """(allowed, Retry-After seconds) for one request of `client` on the rule's route"""
+        rule = compiled.rule
+        key = f"rl:{compiled.method} {compiled.path}:{client}"
+        allowed, retry_after = self.store.take(key, rule.rate, rule.burst, time.time())
+        return allowed, max(1, math.ceil(retry_after))
+
+
+def build_store(backend: str) -> BucketStore:
+    if backend == "memory":
+        return MemoryBucketStore()
+    if backend == "fake-shared":
+        return SharedBucketStore(FakeCASClient())
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {backend}")
+
+
+rate_limiter = RateLimiter(settings.RATE_LIMIT_RULES, build_store(settings.RATE_LIMIT_BACKEND))
+
+
+def set_store(store: BucketStore) -> None:
+    """Plug in another backend, e.g. SharedBucketStore over a real memcached/Redis client"""
+    rate_limiter.store = store
+
+
+def client_identity(scope, authorization: Optional[str], per: str) -> str:
+    """Bucket owner: the token subject for per-user rules, otherwise the client IP"""
+    if per == "user" and authorization:
+        match = _BEARER_RE.match(authorization)
+        if match:
+            try:
+                return "user:" + verify_token(match.group(1))
+            except HTTPException:
+                pass
+    client = scope.get("client")
+    return "ip:" + (client[0] if client else "unknown")
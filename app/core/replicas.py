@@ -0,0 +1,114 @@
+import itertools
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import List, Optional
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.database import SessionLocal, TimedReplicaQueuePool, instrument_engine, pool_options
+from app.core.metrics import Gauge
+
+logger = logging.getLogger(__name__)
+
+# Bu istek birincil veritabanından okumalı mı (ReadYourWritesMiddleware ayarlar)
+_pinned_to_primary: ContextVar[bool] = ContextVar("pinned_to_primary", default=False)
+
+# İstemci anahtarı -> son yazma; TTL sabitleme penceresidir
+primary_pins = LRUCache("primary_pins", maxsize=100000, ttl=settings.READ_YOUR_WRITES_SECONDS)
+
+replica_healthy = Gauge("db_replica_healthy", "1 if the read replica passed its last health check", ("replica",))
+
+
+class Replica:
+    def __init__(self, index: int, url: str):
+        self.index = index
+        self.engine = create_engine(url, **pool_options(url, sync_pool=TimedReplicaQueuePool))
+        instrument_engine(self.engine)
+        self.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.healthy = True
+        self.checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def is_available(self) -> bool:
+        """Health state, re-checked with SELECT 1 at most once per interval"""
+        now = time.monotonic()
+        if now - self.checked_at < settings.REPLICA_HEALTH_CHECK_INTERVAL:
+            return self.healthy
+        # Aynı anda tek kontrol; diğerleri son bilinen durumu kullanır
+        if not self._lock.acquire(blocking=False):
+            return self.healthy
+        try:
+            with self.engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+            self._set_health(True)
+        except DBAPIError:
+            self._set_health(False)
+        finally:
+            self.checked_at = time.monotonic()
+            self._lock.release()
+        return self.healthy
+
+    def mark_failed(self) -> None:
+        self._set_health(False)
+        self.checked_at = time.monotonic()
+
+    def _set_health(self, healthy: bool) -> None:
+        if healthy != self.healthy:
+            logger.warning("read replica %d is %s", self.index, "healthy again" if healthy else "unhealthy")
+        self.healthy = healthy
+
+
+class ReplicaSet:
+    def __init__(self, urls: List[str]):
+        self.replicas = [Replica(index, url) for index, url in enumerate(urls)]
+        self._counter = itertools.count()
+
+    def choose(self) -> Optional[Replica]:
+        """Next healthy replica in round-robin order, or None"""
+        count = len(self.replicas)
+        start = next(self._counter)
+        for offset in range(count):
+            replica = self.replicas[(start + offset) % count]
+            if replica.is_available():
+                return replica
+        return None
+
+
+replica_set = ReplicaSet(settings.DATABASE_REPLICA_URLS)
+
+replica_healthy.set_function(lambda: {
+    (str(replica.index),): int(replica.healthy) for replica in replica_set.replicas
+})
+
+
+def pin_to_primary(pinned: bool):
+    return _pinned_to_primary.set(pinned)
+
+
+def pin_to_primary_reset(token) -> None:
+    _pinned_to_primary.reset(token)
+
+
+def get_read_db():
+    """
+    Session for lag-tolerant GET handlers, bound to a read replica in round-robin
+    order. Falls back to the primary when no replica is configured or healthy, or
+    when the client wrote recently (read-your-writes, see ReadYourWritesMiddleware).
+    """
+    replica = None if _pinned_to_primary.get() else replica_set.choose()
+    db: Session = replica.session_factory() if replica else SessionLocal()
+    try:
+        yield db
+    except DBAPIError as e:
+        # Bağlantı/erişim hatasında replikayı bir sonraki sağlık kontrolüne kadar devre dışı bırak
+        if replica is not None and (e.connection_invalidated or isinstance(e, OperationalError)):
+            replica.mark_failed()
+        raise
+    finally:
+        db.close()
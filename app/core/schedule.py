@@ -0,0 +1,153 @@
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.core.availability import Interval
+from app.core.cache import LRUCache
+from app.core.config import settings
+
+MINUTES_PER_DAY = 24 * 60
+FULL_DAY = (1 << MINUTES_PER_DAY) - 1
+
+# barber_id -> CompiledSchedule
+schedule_cache = LRUCache(
+    "schedules",
+    maxsize=settings.SCHEDULE_CACHE_SIZE,
+    ttl=settings.SCHEDULE_CACHE_TTL,
+)
+
+
+# Önbellekteki takvimi yamalayan yazmalar berber başına sıralanır (sabit sayıda şeritli kilit)
+_PATCH_LOCK_STRIPES = 64
+_patch_locks = [threading.Lock() for _ in range(_PATCH_LOCK_STRIPES)]
+
+
+def schedule_tags(barber_id: int) -> Tuple[tuple]:
+    return (("schedule", barber_id),)
+
+
+def _minute(value: time) -> int:
+    return value.hour * 60 + value.minute
+
+
+def interval_mask(start: Optional[time], end: Optional[time]) -> int:
+    """Bits [start, end) of the day at minute resolution; no times = the whole day"""
+    if start is None and end is None:
+        return FULL_DAY
+    first = _minute(start) if start is not None else 0
+    last = _minute(end) if end is not None else MINUTES_PER_DAY
+    if last <= first:
+        return 0
+    return ((1 << last) - 1) ^ ((1 << first) - 1)
+
+
+def mask_windows(day: date, mask: int) -> List[Interval]:
+    """Runs of set bits as sorted, disjoint datetime intervals"""
+    windows: List[Interval] = []
+    midnight = datetime.combine(day, time.min)
+    while mask:
+        first = (mask & -mask).bit_length() - 1
+        shifted = mask >> first
+        # Ardışık 1 bitlerinin uzunluğu
+        length = (~shifted & (shifted + 1)).bit_length() - 1
+        windows.append((midnight + timedelta(minutes=first), midnight + timedelta(minutes=first + length)))
+        mask &= ~(((1 << length) - 1) << first)
+    return windows
+
+
+@dataclass(frozen=True)
+class CompiledSchedule:
+    """
+    A barber's schedule as minute-resolution bitsets: one mask per weekday plus
+    per-date exceptions as (extra open minutes, closed minutes). The working
+    minutes of a date are (weekly | open) & ~closed.
+    """
+    weekly: Tuple[int, ...] = (0,) * 7
+    exceptions: Dict[date, Tuple[int, int]] = field(default_factory=dict)
+
+    def day_mask(self, day: date) -> int:
+        mask = self.weekly[day.weekday()]
+        override = self.exceptions.get(day)
+        if override is not None:
+            opened, closed = override
+            mask = (mask | opened) & ~closed
+        return mask
+
+    def windows(self, day: date) -> List[Interval]:
+        return mask_windows(day, self.day_mask(day))
+
+    def with_weekdays(self, masks: Dict[int, int]) -> "CompiledSchedule":
+        """Copy with the given weekdays replaced (incremental rebuild)"""
+        weekly = list(self.weekly)
+        for weekday, mask in masks.items():
+            weekly[weekday] = mask
+        return replace(self, weekly=tuple(weekly))
+
+    def with_exception(self, day: date, override: Optional[Tuple[int, int]]) -> "CompiledSchedule":
+        """Copy with one date's exception replaced (None removes it)"""
+        exceptions = dict(self.exceptions)
+        if override is None:
+            exceptions.pop(day, None)
+        else:
+            exceptions[day] = override
+        return replace(self, exceptions=exceptions)
+
+
+def weekday_masks(hours: Iterable) -> Dict[int, int]:
+    """WorkingHours rows -> {weekday: mask}; overlapping intervals simply merge"""
+    masks: Dict[int, int] = {}
+    for wh in hours:
+        masks.setdefault(wh.day_of_week, 0)
+        if wh.is_working:
+            masks[wh.day_of_week] |= interval_mask(wh.start_time, wh.end_time)
+    return masks
+
+
+def exception_override(rows: Iterable) -> Tuple[int, int]:
+    """ScheduleException rows of one date -> (open mask, closed mask)"""
+    opened = closed = 0
+    for row in rows:
+        mask = interval_mask(row.start_time, row.end_time)
+        if row.is_working:
+            opened |= mask
+        else:
+            closed |= mask
+    return opened, closed
+
+
+def compile_schedule(hours: Iterable, exceptions: Iterable) -> CompiledSchedule:
+    masks = weekday_masks(hours)
+    by_date: Dict[date, list] = {}
+    for row in exceptions:
+        by_date.setdefault(row.date, []).append(row)
+    return CompiledSchedule(
+        weekly=tuple(masks.get(weekday, 0) for weekday in range(7)),
+        exceptions={day: exception_override(rows) for day, rows in by_date.items()},
+    )
+
+
+@contextmanager
+def schedule_patch_lock(barber_id: int):
+    """
+    Held around re-reading the committed rows and patch_cached_schedule, so two
+    writes of one barber in this process cannot interleave and lose a patch.
+    """
+    with _patch_locks[barber_id % _PATCH_LOCK_STRIPES]:
+        yield
+
+
+def patch_cached_schedule(barber_id: int, patch: Callable[[CompiledSchedule], CompiledSchedule]) -> None:
+    """
+    Incremental rebuild after a committed schedule write: apply `patch` to the
+    cached schedule instead of recompiling it from the database. Call it under
+    schedule_patch_lock with a patch built from rows read inside the lock.
+    Readers that compiled from pre-write rows lose their snapshot and cannot
+    overwrite it.
+    """
+    current = schedule_cache.get(barber_id)
+    tags = schedule_tags(barber_id)
+    schedule_cache.invalidate_tag(tags[0])
+    if current is not None:
+        schedule_cache.set(barber_id, patch(current), tags=tags)
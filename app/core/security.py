@@ -1,18 +1,82 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer
 from fastapi import Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import LRUCache
 from app.core.config import settings
 from app.models.models import User
 from app.models.schemas import TokenData
-from app.core.database import get_db
+from app.core.database import get_async_db
+
+@dataclass(frozen=True)
+class Principal:
+    """Authenticated user fields needed by dependencies and handlers, cached by token subject"""
+    id: int
+    email: str
+    full_name: Optional[str]
+    phone_number: Optional[str]
+    is_active: bool
+    is_barber: bool
+
+# Token subject (email) -> Principal; kullanıcı satırına yazıldığında geçersiz kılınır
+principal_cache = LRUCache(
+    "principal",
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL,
+)
+
+def invalidate_principal(email: str) -> None:
+    """Call after any write to the user row"""
+    principal_cache.invalidate_tag(("user", email))
 
 # Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min/max = default: maliyet ayarı değişince eski hash'ler girişte yeniden üretilir
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated thread pool (bcrypt releases the GIL) so async
+    handlers never block the event loop. At most `workers` hashes run at once and
+    at most `queue_size` wait; beyond that callers get a fast 503.
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self.limit = workers + queue_size
+        self.pending = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+
+    async def run(self, func, *args):
+        # Sayaç yalnızca event loop thread'inde değişir, kilit gerekmez
+        if self.pending >= self.limit:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication is busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self.pending -= 1
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_size=settings.PASSWORD_HASH_QUEUE_SIZE,
+)
 
 # OAuth2 scheme configuration
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
@@ -25,6 +89,14 @@ def get_password_hash(password: str) -> str:
     """Generate password hash"""
     return pwd_context.hash(password)
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify off the event loop; returns (valid, new_hash) where new_hash is set when the stored hash needs upgrading"""
+    return await password_hasher.run(pwd_context.verify_and_update, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Generate password hash off the event loop"""
+    return await password_hasher.run(pwd_context.hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
     to_encode = data.copy()
@@ -48,22 +120,39 @@ def verify_token(token: str) -> str:
         ) from e
 
 async def get_current_user(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     token: str = Depends(oauth2_scheme)
-) -> User:
+) -> Principal:
     """Get current authenticated user"""
     email = verify_token(token)
-    user = db.query(User).filter(User.email == email).first()
+    principal = principal_cache.get(email)
+    if principal is not None:
+        return principal
+
+    tags = (("user", email),)
+    snapshot = principal_cache.snapshot(tags)
+    result = await db.execute(select(User).where(User.email == email))
+    user = result.scalars().first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    return user
+
+    principal = Principal(
+        id=user.id,
+        email=user.email,
+        full_name=user.full_name,
+        phone_number=user.phone_number,
+        is_active=user.is_active,
+        is_barber=user.is_barber,
+    )
+    principal_cache.set(email, principal, tags=tags, snapshot=snapshot)
+    return principal
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
     """Get current active user"""
     if not current_user.is_active:
         raise HTTPException(
@@ -1,8 +1,33 @@
+from datetime import date, datetime, time
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Dict, Iterable, List, Optional, Tuple
 
-from app.models.models import Service, WorkingHours
-from app.models.schemas import ServiceCreate, WorkingHoursCreate
+from app.models.models import ScheduleException, Service, WorkingHours, User
+from app.models.schemas import ScheduleExceptionCreate, ServiceCreate, WorkingHoursCreate
+from app.core import geo
+from app.core.availability import invalidate_barber_days, invalidate_barber_weekdays
+from app.core.schedule import (
+    CompiledSchedule,
+    compile_schedule,
+    exception_override,
+    patch_cached_schedule,
+    schedule_patch_lock,
+    schedule_cache,
+    schedule_tags,
+    weekday_masks
+)
+from app.core.security import invalidate_principal
+
+def get_barber_catalog_version(db: Session, barber_id: int):
+    return db.query(User.catalog_version).filter(User.id == barber_id, User.is_barber == True).scalar()
+
+def bump_catalog_version(db: Session, barber_id: int):
+    # Aynı transaction içinde; commit ile birlikte görünür olur
+    db.query(User).filter(User.id == barber_id).update(
+        {User.catalog_version: User.catalog_version + 1},
+        synchronize_session=False
+    )
 
 def get_barber_services(db: Session, barber_id: int):
     return db.query(Service).filter(Service.barber_id == barber_id).all()
@@ -10,28 +35,171 @@ def get_barber_services(db: Session, barber_id: int):
 def create_barber_service(db: Session, service: ServiceCreate, barber_id: int):
     db_service = Service(**service.dict(), barber_id=barber_id)
     db.add(db_service)
+    bump_catalog_version(db, barber_id)
     db.commit()
     db.refresh(db_service)
     return db_service
 
 def get_barber_working_hours(db: Session, barber_id: int):
-    return db.query(WorkingHours).filter(WorkingHours.barber_id == barber_id).all()
+    return db.query(WorkingHours).filter(WorkingHours.barber_id == barber_id).order_by(
+        WorkingHours.day_of_week, WorkingHours.start_time, WorkingHours.id
+    ).all()
+
+def _interval_key(day_of_week: int, start_time: time, end_time: time, is_working: bool):
+    return day_of_week, start_time, end_time, bool(is_working)
 
 def update_barber_working_hours(db: Session, barber_id: int, working_hours: List[WorkingHoursCreate]):
-    # First delete existing working hours
-    db.query(WorkingHours).filter(WorkingHours.barber_id == barber_id).delete()
-    
-    # Add new working hours
-    new_hours = []
+    """
+    Diff the requested intervals against the stored rows: identical intervals are
+    kept, changed ones are updated in place, only the surplus is deleted or inserted.
+    Caches are refreshed for the changed weekdays only; an unchanged PUT writes nothing.
+    """
+    existing = {}
+    for row in get_barber_working_hours(db, barber_id):
+        existing.setdefault(_interval_key(row.day_of_week, row.start_time, row.end_time, row.is_working), []).append(row)
+
+    missing = []
     for wh in working_hours:
-        db_wh = WorkingHours(**wh.dict(), barber_id=barber_id)
-        db.add(db_wh)
-        new_hours.append(db_wh)
-    
+        rows = existing.get(_interval_key(wh.day_of_week, wh.start_time, wh.end_time, wh.is_working))
+        if rows:
+            rows.pop()
+        else:
+            missing.append(wh)
+    surplus = sorted((row for rows in existing.values() for row in rows), key=lambda row: (row.day_of_week, row.start_time))
+    missing.sort(key=lambda wh: (wh.day_of_week, wh.start_time))
+
+    if not surplus and not missing:
+        return get_barber_working_hours(db, barber_id)
+
+    changed_days = set()
+    # Fazla satırlar yeni aralıklar için yeniden kullanılır (DELETE + INSERT yerine UPDATE)
+    for row, wh in zip(surplus, missing):
+        changed_days.update((row.day_of_week, wh.day_of_week))
+        row.day_of_week = wh.day_of_week
+        row.start_time = wh.start_time
+        row.end_time = wh.end_time
+        row.is_working = wh.is_working
+    for row in surplus[len(missing):]:
+        changed_days.add(row.day_of_week)
+        db.delete(row)
+    for wh in missing[len(surplus):]:
+        changed_days.add(wh.day_of_week)
+        db.add(WorkingHours(**wh.dict(), barber_id=barber_id))
+
+    bump_catalog_version(db, barber_id)
+    db.commit()
+
+    # Kilit içinde okunur: eşzamanlı başka bir yazma kendi yamasını bundan sonra, daha yeni satırlarla yapar
+    with schedule_patch_lock(barber_id):
+        hours = get_barber_working_hours(db, barber_id)
+        masks = weekday_masks(hours)
+        # Önce derlenmiş takvim, sonra slot önbelleği: slotları yeniden hesaplayan okuma yeni takvimi görür
+        patch_cached_schedule(
+            barber_id,
+            lambda schedule: schedule.with_weekdays({day: masks.get(day, 0) for day in changed_days})
+        )
+    invalidate_barber_weekdays(barber_id, changed_days)
+    return hours
+
+def get_compiled_schedules(db: Session, barber_ids: Iterable[int]) -> Dict[int, CompiledSchedule]:
+    """Compiled schedules of several barbers; cache misses are loaded together in two queries"""
+    result = {}
+    missing = []
+    for barber_id in set(barber_ids):
+        schedule = schedule_cache.get(barber_id)
+        if schedule is None:
+            missing.append(barber_id)
+        else:
+            result[barber_id] = schedule
+    if not missing:
+        return result
+
+    # Sorgulardan önce alınır: derleme sırasında gelen bir yazma eski takvimi önbelleğe yazdırmaz
+    snapshots = {barber_id: schedule_cache.snapshot(schedule_tags(barber_id)) for barber_id in missing}
+    hours_by_barber = {barber_id: [] for barber_id in missing}
+    for row in db.query(
+        WorkingHours.barber_id, WorkingHours.day_of_week, WorkingHours.start_time,
+        WorkingHours.end_time, WorkingHours.is_working
+    ).filter(WorkingHours.barber_id.in_(missing)).all():
+        hours_by_barber[row.barber_id].append(row)
+    exceptions_by_barber = {barber_id: [] for barber_id in missing}
+    for row in db.query(
+        ScheduleException.barber_id, ScheduleException.date, ScheduleException.start_time,
+        ScheduleException.end_time, ScheduleException.is_working
+    ).filter(ScheduleException.barber_id.in_(missing)).all():
+        exceptions_by_barber[row.barber_id].append(row)
+
+    for barber_id in missing:
+        schedule = compile_schedule(hours_by_barber[barber_id], exceptions_by_barber[barber_id])
+        schedule_cache.set(barber_id, schedule, tags=schedule_tags(barber_id), snapshot=snapshots[barber_id])
+        result[barber_id] = schedule
+    return result
+
+def get_compiled_schedule(db: Session, barber_id: int) -> CompiledSchedule:
+    return get_compiled_schedules(db, [barber_id])[barber_id]
+
+def get_schedule_exceptions(
+    db: Session,
+    barber_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+):
+    query = db.query(ScheduleException).filter(ScheduleException.barber_id == barber_id)
+    if start_date is not None:
+        query = query.filter(ScheduleException.date >= start_date)
+    if end_date is not None:
+        query = query.filter(ScheduleException.date <= end_date)
+    return query.order_by(ScheduleException.date, ScheduleException.start_time, ScheduleException.id).all()
+
+def _schedule_exceptions_changed(db: Session, barber_id: int, day: date):
+    """Patch the cached schedule with the committed exceptions of `day`; returns them"""
+    with schedule_patch_lock(barber_id):
+        rows = get_schedule_exceptions(db, barber_id, day, day)
+        override = exception_override(rows) if rows else None
+        patch_cached_schedule(barber_id, lambda schedule: schedule.with_exception(day, override))
+    day_start = datetime.combine(day, time.min)
+    invalidate_barber_days(barber_id, day_start, day_start)
+    return rows
+
+def replace_schedule_exceptions(
+    db: Session,
+    barber_id: int,
+    day: date,
+    exceptions: List[ScheduleExceptionCreate]
+):
+    """Set the exceptions of one date (closed time and/or extra hours)"""
+    db.query(ScheduleException).filter(
+        ScheduleException.barber_id == barber_id,
+        ScheduleException.date == day
+    ).delete(synchronize_session=False)
+    for exception in exceptions:
+        db.add(ScheduleException(**exception.dict(), date=day, barber_id=barber_id))
+    bump_catalog_version(db, barber_id)
     db.commit()
-    return new_hours
 
-def update_barber_profile(db: Session, barber_id: int, bio: str, shop_name: str, shop_address: str):
+    return _schedule_exceptions_changed(db, barber_id, day)
+
+def delete_schedule_exceptions(db: Session, barber_id: int, day: date) -> int:
+    deleted = db.query(ScheduleException).filter(
+        ScheduleException.barber_id == barber_id,
+        ScheduleException.date == day
+    ).delete(synchronize_session=False)
+    if not deleted:
+        return 0
+    bump_catalog_version(db, barber_id)
+    db.commit()
+    _schedule_exceptions_changed(db, barber_id, day)
+    return deleted
+
+def update_barber_profile(
+    db: Session,
+    barber_id: int,
+    bio: str,
+    shop_name: str,
+    shop_address: str,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None
+):
     barber = db.query(User).filter(User.id == barber_id).first()
     if not barber:
         return None
@@ -39,6 +207,51 @@ def update_barber_profile(db: Session, barber_id: int, bio: str, shop_name: str,
     barber.barber_bio = bio
     barber.barber_shop_name = shop_name
     barber.barber_shop_address = shop_address
+    if latitude is not None and longitude is not None:
+        barber.latitude = latitude
+        barber.longitude = longitude
+        barber.geohash = geo.encode(latitude, longitude)
+    barber.catalog_version = User.catalog_version + 1
     db.commit()
     db.refresh(barber)
-    return barber
\ No newline at end of file
+    invalidate_principal(barber.email)
+    return barber
+
+def _geohash_prefix(cell: str):
+    # Yerel ayar sıralamasından bağımsız aralık: noktalama karakteri içeren üst sınır yok
+    upper = geo.prefix_upper_bound(cell)
+    if upper is None:
+        return User.geohash >= cell
+    return and_(User.geohash >= cell, User.geohash < upper)
+
+def get_nearby_barbers(
+    db: Session,
+    latitude: float,
+    longitude: float,
+    radius_km: float,
+    q: Optional[str] = None,
+    limit: int = 20
+) -> List[Tuple[User, float]]:
+    """
+    Barbers within `radius_km`, nearest first, as (barber, distance_km).
+    Candidates come from index range scans over the 3x3 geohash cells around the
+    point, so the cost depends on local density, not on the total number of barbers.
+    """
+    precision = geo.precision_for_radius(radius_km, latitude)
+    cells = geo.neighbors(geo.encode(latitude, longitude, precision))
+    query = db.query(User).filter(
+        User.is_barber == True,
+        or_(*(_geohash_prefix(cell) for cell in cells))
+    )
+    if q:
+        pattern = f"%{q}%"
+        query = query.filter(or_(User.full_name.ilike(pattern), User.barber_shop_name.ilike(pattern)))
+
+    # Hücreler kare, arama alanı daire: kesin mesafe ile süz ve sırala
+    ranked = []
+    for barber in query.all():
+        distance = geo.haversine_km(latitude, longitude, barber.latitude, barber.longitude)
+        if distance <= radius_km:
+            ranked.append((barber, distance))
+    ranked.sort(key=lambda item: (item[1], item[0].id))
+    return ranked[:limit]
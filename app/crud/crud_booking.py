@@ -1,17 +1,104 @@
+from collections import Counter
 from datetime import datetime, timedelta, date, time
-from typing import List, Optional
+from typing import Any, List, Optional, Sequence, Tuple
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, not_
+from sqlalchemy import and_, or_, not_, select, tuple_, insert
 
-from app.models.models import Booking, Service, WorkingHours
-from app.models.schemas import BookingCreate, AvailableSlots
+from app.models.models import Booking, Service, User
+from app.models.schemas import (
+    BookingCreate,
+    AvailableSlots,
+    BarberAvailability,
+    RecurrenceRule,
+    BookingOccurrence,
+    BulkBookingResult
+)
+from app.crud.crud_barber import get_compiled_schedule, get_compiled_schedules
+from app.crud.crud_stats import apply_stats_deltas, apply_stats_deltas_async, booking_delta
+from app.core.locks import (
+    BarberBusyError,
+    BookingConflictError,
+    barber_write_lock,
+    barber_write_lock_async,
+    is_overlap_violation
+)
+from app.core.availability import (
+    compute_range_slots,
+    compute_day_slots,
+    merge_intervals,
+    availability_cache,
+    availability_tags,
+    invalidate_barber_days
+)
 
-def get_bookings(db: Session, barber_id: int, skip: int = 0, limit: int = 100):
-    return db.query(Booking).filter(Booking.barber_id == barber_id).offset(skip).limit(limit).all()
+def get_bookings(
+    db: Session,
+    barber_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[Tuple[datetime, int]] = None,
+    columns: Optional[Sequence[Any]] = None
+):
+    # columns verilirse ORM nesnesi yerine satır tuple'ları döner
+    query = db.query(*(columns or (Booking,))).filter(
+        Booking.barber_id == barber_id
+    ).order_by(Booking.start_time, Booking.id)
+    # Keyset: (start_time, id) imlecinden sonrası
+    if after is not None:
+        query = query.filter(tuple_(Booking.start_time, Booking.id) > tuple(after))
+    else:
+        query = query.offset(skip)
+    return query.limit(limit).all()
+
+# Dışa aktarımda seçilen kolonlar; ORM nesnesi (identity map) oluşturulmaz
+EXPORT_COLUMNS = (
+    Booking.id,
+    Booking.start_time,
+    Booking.end_time,
+    Booking.status,
+    Booking.service_id,
+    Booking.customer_name,
+    Booking.customer_email,
+    Booking.customer_phone,
+    Booking.notes,
+    Booking.created_at,
+)
+
+def iter_booking_export_batches(
+    db: Session,
+    barber_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    batch_size: int = 1000
+):
+    """Yield lists of plain row tuples; Postgres streams them through a server-side cursor"""
+    stmt = select(*EXPORT_COLUMNS).where(Booking.barber_id == barber_id)
+    if start_date is not None:
+        stmt = stmt.where(Booking.start_time >= datetime.combine(start_date, time.min))
+    if end_date is not None:
+        stmt = stmt.where(Booking.start_time < datetime.combine(end_date + timedelta(days=1), time.min))
+    stmt = stmt.order_by(Booking.start_time, Booking.id)
+
+    result = db.execute(stmt, execution_options={"stream_results": True, "yield_per": batch_size})
+    try:
+        for partition in result.partitions():
+            yield partition
+    finally:
+        result.close()
 
 def get_customer_bookings(db: Session, customer_email: str):
     return db.query(Booking).filter(Booking.customer_email == customer_email).all()
 
+def overlap_conditions(barber_id: int, start_time: datetime, end_time: datetime):
+    return (
+        Booking.barber_id == barber_id,
+        Booking.status == "confirmed",
+        Booking.start_time < end_time,
+        Booking.end_time > start_time
+    )
+
 def create_booking(db: Session, booking_data: dict):
     # Servis süresini al
     service = db.query(Service).filter(Service.id == booking_data["service_id"]).first()
@@ -22,72 +109,327 @@ def create_booking(db: Session, booking_data: dict):
     start_time = booking_data["start_time"]
     end_time = start_time + timedelta(minutes=service.duration)
     
-    db_booking = BookingModel(
+    db_booking = Booking(
         **booking_data,
+        barber_id=service.barber_id,
         end_time=end_time,
+        price=service.price,
         status="confirmed"
     )
-    db.add(db_booking)
-    db.commit()
+    # Aynı berberin yazmaları sırayla; kontrol ve ekleme arasında başka randevu giremez
+    with barber_write_lock(db, service.barber_id):
+        if db.query(Booking.id).filter(*overlap_conditions(service.barber_id, start_time, end_time)).first():
+            db.rollback()
+            raise BookingConflictError("Slot is already booked")
+        db.add(db_booking)
+        # Günlük toplamlar aynı transaction'da: randevu geri alınırsa onlar da geri alınır
+        apply_stats_deltas(db, [booking_delta(service.barber_id, start_time, service.duration, service.price)])
+        try:
+            db.commit()
+        except IntegrityError as e:
+            db.rollback()
+            if is_overlap_violation(e):
+                raise BookingConflictError("Slot is already booked") from e
+            raise
     db.refresh(db_booking)
+    invalidate_barber_days(db_booking.barber_id, db_booking.start_time, db_booking.end_time)
     return db_booking
 
+async def create_booking_async(db: AsyncSession, booking_data: dict):
+    # Servis süresini al
+    service = await db.get(Service, booking_data["service_id"])
+    if not service:
+        raise ValueError("Service not found")
+
+    # Bitiş zamanını hesapla
+    start_time = booking_data["start_time"]
+    end_time = start_time + timedelta(minutes=service.duration)
+
+    db_booking = Booking(
+        **booking_data,
+        barber_id=service.barber_id,
+        end_time=end_time,
+        price=service.price,
+        status="confirmed"
+    )
+    async with barber_write_lock_async(db, service.barber_id):
+        result = await db.execute(
+            select(Booking.id).where(*overlap_conditions(service.barber_id, start_time, end_time)).limit(1)
+        )
+        if result.first():
+            await db.rollback()
+            raise BookingConflictError("Slot is already booked")
+        db.add(db_booking)
+        await apply_stats_deltas_async(db, [booking_delta(service.barber_id, start_time, service.duration, service.price)])
+        try:
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            if is_overlap_violation(e):
+                raise BookingConflictError("Slot is already booked") from e
+            raise
+    await db.refresh(db_booking)
+    invalidate_barber_days(db_booking.barber_id, db_booking.start_time, db_booking.end_time)
+    return db_booking
+
+def expand_recurrence(rule: RecurrenceRule, max_occurrences: int) -> List[datetime]:
+    step = timedelta(days=rule.interval if rule.frequency == "daily" else 7 * rule.interval)
+    occurrences = []
+    current = rule.start_time
+    while (rule.count is None or len(occurrences) < rule.count) and \
+            (rule.until is None or current.date() <= rule.until):
+        if len(occurrences) >= max_occurrences:
+            raise ValueError(f"Recurrence expands to more than {max_occurrences} occurrences")
+        occurrences.append(current)
+        current += step
+    return occurrences
+
+def create_bookings_bulk(db: Session, booking_data: dict, start_times: List[datetime]):
+    """
+    Check every occurrence against existing bookings in one query and insert the
+    accepted ones in a single transaction. booking_data holds the shared fields.
+    """
+    # Tekli randevudaki kontrolün aynısı: servis bir berbere ait olmalı
+    service = db.query(Service).join(User, User.id == Service.barber_id).filter(
+        Service.id == booking_data["service_id"],
+        User.is_barber == True
+    ).first()
+    if not service:
+        raise ValueError("Barber not found")
+
+    duration = timedelta(minutes=service.duration)
+    requested = sorted({start: start + duration for start in start_times}.items())
+    if not requested:
+        return BulkBookingResult(accepted=0, rejected=0, occurrences=[])
+
+    with barber_write_lock(db, service.barber_id):
+        occurrences, new_bookings = _check_occurrences(db, service, booking_data, requested)
+        occurrences = _with_duplicates(occurrences, start_times)
+
+        # Tek INSERT (executemany + RETURNING), tek commit
+        booking_ids = {}
+        try:
+            if new_bookings:
+                result = db.execute(insert(Booking).returning(Booking.id, Booking.start_time), new_bookings)
+                booking_ids = {row.start_time: row.id for row in result}
+                apply_stats_deltas(db, (
+                    booking_delta(service.barber_id, b["start_time"], service.duration, service.price)
+                    for b in new_bookings
+                ))
+            db.commit()
+        except IntegrityError as e:
+            db.rollback()
+            if is_overlap_violation(e):
+                raise BarberBusyError("Slots changed while booking, please retry") from e
+            raise
+
+    for occurrence in occurrences:
+        if occurrence.status == "accepted":
+            occurrence.booking_id = booking_ids.get(occurrence.start_time)
+            invalidate_barber_days(service.barber_id, occurrence.start_time, occurrence.end_time)
+
+    return BulkBookingResult(
+        accepted=len(new_bookings),
+        rejected=len(occurrences) - len(new_bookings),
+        occurrences=occurrences
+    )
+
+def _with_duplicates(occurrences: List[BookingOccurrence], start_times: List[datetime]) -> List[BookingOccurrence]:
+    # Aynı başlangıç birden çok istendiyse fazlası reddedilir: yanıt her istenen tekrarı içerir
+    counts = Counter(start_times)
+    result = []
+    for occurrence in occurrences:
+        result.append(occurrence)
+        result.extend(
+            BookingOccurrence(
+                start_time=occurrence.start_time,
+                end_time=occurrence.end_time,
+                status="rejected",
+                reason="Duplicate of another occurrence in this request"
+            )
+            for _ in range(counts[occurrence.start_time] - 1)
+        )
+    return result
+
+def _check_occurrences(db: Session, service: Service, booking_data: dict, requested):
+    # Herhangi bir tekrarla çakışan mevcut randevular tek sorguda
+    existing = db.query(Booking.start_time, Booking.end_time).filter(
+        Booking.barber_id == service.barber_id,
+        Booking.status == "confirmed",
+        or_(*[
+            and_(Booking.start_time < end, Booking.end_time > start)
+            for start, end in requested
+        ])
+    ).order_by(Booking.start_time).all()
+    busy = merge_intervals((b.start_time, b.end_time) for b in existing)
+
+    occurrences = []
+    new_bookings = []
+    i = 0
+    last_accepted_end = None
+    for start, end in requested:
+        while i < len(busy) and busy[i][1] <= start:
+            i += 1
+        if i < len(busy) and busy[i][0] < end:
+            occurrences.append(BookingOccurrence(start_time=start, end_time=end, status="rejected", reason="Slot is already booked"))
+            continue
+        if last_accepted_end is not None and start < last_accepted_end:
+            occurrences.append(BookingOccurrence(start_time=start, end_time=end, status="rejected", reason="Overlaps another occurrence in this request"))
+            continue
+        new_bookings.append({
+            **booking_data,
+            "barber_id": service.barber_id,
+            "start_time": start,
+            "end_time": end,
+            "price": service.price,
+            "status": "confirmed"
+        })
+        occurrences.append(BookingOccurrence(start_time=start, end_time=end, status="accepted"))
+        last_accepted_end = end
+
+    return occurrences, new_bookings
+
 def cancel_booking(db: Session, booking_id: int):
     booking = db.query(Booking).filter(Booking.id == booking_id).first()
     if not booking:
         return None
-    
-    booking.status = "cancelled"
-    db.commit()
+
+    with barber_write_lock(db, booking.barber_id):
+        # Koşullu güncelleme: aynı randevuyu eşzamanlı iptal eden iki istek toplamları iki kez düşmez
+        cancelled = db.query(Booking).filter(
+            Booking.id == booking_id,
+            Booking.status != "cancelled"
+        ).update({Booking.status: "cancelled"}, synchronize_session=False)
+        if cancelled:
+            # Oluştururken eklenen fiyat düşülür (servisin güncel fiyatı değil)
+            apply_stats_deltas(db, [booking_delta(
+                booking.barber_id,
+                booking.start_time,
+                int((booking.end_time - booking.start_time).total_seconds() // 60),
+                booking.price,
+                cancelled=True
+            )])
+        db.commit()
     db.refresh(booking)
+    invalidate_barber_days(booking.barber_id, booking.start_time, booking.end_time)
     return booking
 
-def get_available_slots(db: Session, barber_id: int, service_id: int, selected_date: date):
-    # Get service duration
-    service = db.query(Service).filter(Service.id == service_id).first()
+def get_available_slots_range(db: Session, barber_id: int, service_id: int, start_date: date, end_date: date):
+    days = [start_date + timedelta(days=n) for n in range((end_date - start_date).days + 1)]
+
+    # Tüm günler önbellekte ise veritabanına hiç gitme
+    cached = [availability_cache.get((barber_id, service_id, day)) for day in days]
+    if all(slots is not None for slots in cached):
+        return cached
+
+    # Sorgulardan önce alınır: hesaplama sırasında gelen bir yazma sonucu önbelleğe yazdırmaz
+    snapshots = {day: availability_cache.snapshot(availability_tags(barber_id, day)) for day in days}
+
+    # Servis süresini al
+    service = db.query(Service).filter(
+        Service.id == service_id,
+        Service.barber_id == barber_id
+    ).first()
     if not service:
         return None
-    
-    # Get barber's working hours for the selected day
-    day_of_week = selected_date.weekday()
-    working_hours = db.query(WorkingHours).filter(
-        WorkingHours.barber_id == barber_id,
-        WorkingHours.day_of_week == day_of_week,
-        WorkingHours.is_working == True
-    ).first()
-    
-    if not working_hours:
-        return AvailableSlots(date=selected_date, available_times=[])
-    
-    # Get all bookings for the selected date
-    start_of_day = datetime.combine(selected_date, time.min)
-    end_of_day = datetime.combine(selected_date, time.max)
-    
-    bookings = db.query(Booking).filter(
+
+    # Derlenmiş takvim (haftalık aralıklar + tarih istisnaları), çoğunlukla önbellekten
+    schedule = get_compiled_schedule(db, barber_id)
+
+    # Tüm aralıktaki onaylı randevular tek sorguda, başlangıca göre sıralı
+    range_start = datetime.combine(start_date, time.min)
+    range_end = datetime.combine(end_date + timedelta(days=1), time.min)
+    bookings = db.query(Booking.start_time, Booking.end_time).filter(
         Booking.barber_id == barber_id,
-        Booking.start_time >= start_of_day,
-        Booking.start_time <= end_of_day,
+        Booking.start_time < range_end,
+        Booking.end_time > range_start,
         Booking.status == "confirmed"
-    ).all()
-    
-    # Generate time slots
-    slot_duration = timedelta(minutes=service.duration)
-    current_time = datetime.combine(selected_date, working_hours.start_time)
-    end_time = datetime.combine(selected_date, working_hours.end_time)
-    
-    available_slots = []
-    while current_time + slot_duration <= end_time:
-        # Check if slot is available
-        slot_available = True
-        for booking in bookings:
-            if (current_time < booking.end_time) and (current_time + slot_duration > booking.start_time):
-                slot_available = False
-                break
-        
-        if slot_available:
-            available_slots.append(current_time)
-        
-        # Move to next slot (with 15 minutes interval between slots)
-        current_time += timedelta(minutes=15)
-    
-    return AvailableSlots(date=selected_date, available_times=available_slots)
\ No newline at end of file
+    ).order_by(Booking.start_time).all()
+
+    slots_by_day = compute_range_slots(
+        start_date,
+        end_date,
+        schedule.windows,
+        [(b.start_time, b.end_time) for b in bookings],
+        service.duration
+    )
+    result = []
+    for day, times in slots_by_day.items():
+        slots = AvailableSlots(date=day, available_times=times)
+        availability_cache.set(
+            (barber_id, service_id, day),
+            slots,
+            tags=availability_tags(barber_id, day),
+            snapshot=snapshots[day]
+        )
+        result.append(slots)
+    return result
+
+def get_available_slots(db: Session, barber_id: int, service_id: int, selected_date: date):
+    slots = get_available_slots_range(db, barber_id, service_id, selected_date, selected_date)
+    if slots is None:
+        return None
+    return slots[0]
+
+def search_available_barbers(
+    db: Session,
+    selected_date: date,
+    time_from: Optional[time] = None,
+    time_to: Optional[time] = None,
+    service_name: Optional[str] = None
+):
+    # 1. Aday berberler ve servisleri tek sorguda
+    query = db.query(Service, User).join(User, Service.barber_id == User.id).filter(
+        User.is_barber == True,
+        User.is_active == True
+    )
+    if service_name:
+        query = query.filter(Service.name.ilike(f"%{service_name}%"))
+    candidates = query.order_by(User.id, Service.id).all()
+    if not candidates:
+        return []
+
+    barber_ids = {barber.id for _, barber in candidates}
+
+    # 2. Tüm adayların o günkü çalışma pencereleri (derlenmiş takvimler, eksikler tek seferde)
+    windows_by_barber = {}
+    for barber_id, schedule in get_compiled_schedules(db, barber_ids).items():
+        windows = schedule.windows(selected_date)
+        if windows:
+            windows_by_barber[barber_id] = windows
+
+    # 3. Tüm adayların o günkü onaylı randevuları tek sorguda
+    day_start = datetime.combine(selected_date, time.min)
+    day_end = day_start + timedelta(days=1)
+    bookings_by_barber = {}
+    for b in db.query(Booking.barber_id, Booking.start_time, Booking.end_time).filter(
+        Booking.barber_id.in_(windows_by_barber.keys()),
+        Booking.start_time < day_end,
+        Booking.end_time > day_start,
+        Booking.status == "confirmed"
+    ).all():
+        bookings_by_barber.setdefault(b.barber_id, []).append((b.start_time, b.end_time))
+
+    services_by_barber = {}
+    for service, barber in candidates:
+        if barber.id in windows_by_barber:
+            services_by_barber.setdefault(barber.id, (barber, []))[1].append(service)
+
+    window_start = datetime.combine(selected_date, time_from or time.min)
+    window_end = datetime.combine(selected_date, time_to or time.max)
+
+    results = []
+    for barber_id, (barber, services) in services_by_barber.items():
+        slots_by_duration = compute_day_slots(
+            windows_by_barber[barber_id],
+            bookings_by_barber.get(barber_id, []),
+            [service.duration for service in services]
+        )
+        for service in services:
+            times = [
+                t for t in slots_by_duration[service.duration]
+                if window_start <= t <= window_end
+            ]
+            if times:
+                results.append(BarberAvailability(barber=barber, service=service, available_times=times))
+    return results
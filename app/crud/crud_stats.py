@@ -0,0 +1,134 @@
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.schedule import CompiledSchedule
+from app.models.models import BarberDailyStats
+from app.models.schemas import BarberStatsPeriod
+
+# Günlük toplamlarda artırılan sayaç kolonları
+COUNTERS = ("bookings", "cancellations", "revenue", "booked_minutes")
+
+_DIALECT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+def booking_delta(barber_id: int, start_time: datetime, duration: int, price: float, cancelled: bool = False) -> dict:
+    """Rollup change of one booking being created (or cancelled)"""
+    sign = -1 if cancelled else 1
+    return {
+        "barber_id": barber_id,
+        "day": start_time.date(),
+        "bookings": sign,
+        "cancellations": 1 if cancelled else 0,
+        "revenue": sign * (price or 0.0),
+        "booked_minutes": sign * (duration or 0),
+    }
+
+def merge_deltas(deltas: Iterable[dict]) -> List[dict]:
+    """One row per (barber_id, day): an upsert may not touch the same row twice"""
+    merged: Dict[Tuple[int, date], dict] = {}
+    for delta in deltas:
+        key = (delta["barber_id"], delta["day"])
+        if key in merged:
+            for column in COUNTERS:
+                merged[key][column] += delta[column]
+        else:
+            merged[key] = dict(delta)
+    return list(merged.values())
+
+def _upsert_statement(dialect_name: str):
+    # INSERT ... ON CONFLICT (barber_id, day) DO UPDATE SET kolon = kolon + excluded.kolon
+    stmt = _DIALECT_INSERTS[dialect_name](BarberDailyStats)
+    return stmt.on_conflict_do_update(
+        index_elements=[BarberDailyStats.barber_id, BarberDailyStats.day],
+        set_={column: getattr(BarberDailyStats, column) + getattr(stmt.excluded, column) for column in COUNTERS}
+    )
+
+def _increment_statement(delta: dict):
+    return update(BarberDailyStats).where(
+        BarberDailyStats.barber_id == delta["barber_id"],
+        BarberDailyStats.day == delta["day"]
+    ).values({column: getattr(BarberDailyStats, column) + delta[column] for column in COUNTERS})
+
+def apply_stats_deltas(db: Session, deltas: Iterable[dict]) -> None:
+    """Add deltas to the rollups inside the caller's transaction (committed with the booking)"""
+    rows = merge_deltas(deltas)
+    if not rows:
+        return
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name in _DIALECT_INSERTS:
+        db.execute(_upsert_statement(dialect_name), rows)
+        return
+    # Diğer veritabanları: önce artır, satır yoksa ekle
+    for row in rows:
+        if db.execute(_increment_statement(row)).rowcount == 0:
+            db.execute(insert(BarberDailyStats), [row])
+
+async def apply_stats_deltas_async(db: AsyncSession, deltas: Iterable[dict]) -> None:
+    """apply_stats_deltas for AsyncSession"""
+    rows = merge_deltas(deltas)
+    if not rows:
+        return
+    dialect_name = db.bind.dialect.name
+    if dialect_name in _DIALECT_INSERTS:
+        await db.execute(_upsert_statement(dialect_name), rows)
+        return
+    for row in rows:
+        if (await db.execute(_increment_statement(row))).rowcount == 0:
+            await db.execute(insert(BarberDailyStats), [row])
+
+def get_daily_stats(db: Session, barber_id: int, start_date: date, end_date: date) -> List[BarberDailyStats]:
+    return db.query(BarberDailyStats).filter(
+        BarberDailyStats.barber_id == barber_id,
+        BarberDailyStats.day >= start_date,
+        BarberDailyStats.day <= end_date
+    ).order_by(BarberDailyStats.day).all()
+
+def period_start(day: date, granularity: str) -> date:
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+def summarize_stats(
+    rows: Iterable[BarberDailyStats],
+    schedule: CompiledSchedule,
+    start_date: date,
+    end_date: date,
+    granularity: str = "day"
+) -> List[BarberStatsPeriod]:
+    """
+    Group daily rollups into day/week/month periods (clipped to the requested
+    range). Utilization is booked minutes over the minutes the compiled
+    schedule has the barber working, so no booking rows are read.
+    """
+    by_day = {row.day: row for row in rows}
+    periods: Dict[date, BarberStatsPeriod] = {}
+    day = start_date
+    while day <= end_date:
+        key = period_start(day, granularity)
+        period = periods.get(key)
+        if period is None:
+            period = periods[key] = BarberStatsPeriod(start=max(key, start_date), end=day)
+        period.end = day
+        period.scheduled_minutes += bin(schedule.day_mask(day)).count("1")
+        row = by_day.get(day)
+        if row is not None:
+            period.bookings += row.bookings
+            period.cancellations += row.cancellations
+            period.revenue += row.revenue
+            period.booked_minutes += row.booked_minutes
+        day += timedelta(days=1)
+
+    for period in periods.values():
+        period.revenue = round(period.revenue, 2)
+        if period.scheduled_minutes:
+            period.utilization = round(period.booked_minutes / period.scheduled_minutes, 4)
+    return list(periods.values())
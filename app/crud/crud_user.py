@@ -1,9 +1,11 @@
-from sqlalchemy.orm import Session
-from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from typing import Any, Iterable, Optional, Sequence
 
 from app.models.models import User
 from app.models.schemas import UserCreate
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash, get_password_hash_async, invalidate_principal
 
 def get_user(db: Session, user_id: int):
     return db.query(User).filter(User.id == user_id).first()
@@ -11,8 +13,31 @@ def get_user(db: Session, user_id: int):
 def get_user_by_email(db: Session, email: str):
     return db.query(User).filter(User.email == email).first()
 
-def get_users(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(User).offset(skip).limit(limit).all()
+async def get_user_by_email_async(db: AsyncSession, email: str):
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalars().first()
+
+async def update_password_hash_async(db: AsyncSession, user: User, hashed_password: str):
+    user.hashed_password = hashed_password
+    await db.commit()
+    invalidate_principal(user.email)
+    return user
+
+def get_users(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+    columns: Optional[Sequence[Any]] = None
+):
+    # columns verilirse ORM nesnesi yerine satır tuple'ları döner
+    query = db.query(*(columns or (User,))).order_by(User.id)
+    # Keyset: imleç verilirse atlanan satırlar hiç taranmaz
+    if after_id is not None:
+        query = query.filter(User.id > after_id)
+    else:
+        query = query.offset(skip)
+    return query.limit(limit).all()
 
 def create_user(db: Session, user: UserCreate):
     hashed_password = get_password_hash(user.password)
@@ -26,7 +51,50 @@ def create_user(db: Session, user: UserCreate):
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    invalidate_principal(db_user.email)
+    return db_user
+
+async def create_user_async(db: AsyncSession, user: UserCreate):
+    hashed_password = await get_password_hash_async(user.password)
+    db_user = User(
+        email=user.email,
+        hashed_password=hashed_password,
+        full_name=user.full_name,
+        phone_number=user.phone_number,
+        is_barber=user.is_barber
+    )
+    db.add(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    invalidate_principal(db_user.email)
     return db_user
 
-def get_barbers(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(User).filter(User.is_barber == True).offset(skip).limit(limit).all()
\ No newline at end of file
+# ?expand= ile istenebilen ilişkiler
+BARBER_EXPANDABLE = {
+    "services": User.services,
+    "working_hours": User.working_hours,
+}
+
+def get_barbers(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+    expand: Iterable[str] = (),
+    columns: Optional[Sequence[Any]] = None
+):
+    query = db.query(*(columns or (User,))).filter(User.is_barber == True).order_by(User.id)
+    # İlişki başına tek bir IN sorgusu; sayfa boyutundan bağımsız, lazy load yok
+    for name in expand:
+        query = query.options(selectinload(BARBER_EXPANDABLE[name]))
+    if after_id is not None:
+        query = query.filter(User.id > after_id)
+    else:
+        query = query.offset(skip)
+    return query.limit(limit).all()
+
+def get_barber_full(db: Session, barber_id: int):
+    return db.query(User).options(
+        selectinload(User.services),
+        selectinload(User.working_hours)
+    ).filter(User.id == barber_id, User.is_barber == True).first()
@@ -1,22 +1,52 @@
-from fastapi import FastAPI, Depends
+from typing import Optional
+
+from fastapi import FastAPI, Depends, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
-from app.core.database import engine, SessionLocal
-from app.models.models import Base
+from app.core import metrics
+from app.core.cache import cache_stats
+from app.core.database import SessionLocal
+from app.core.logging_config import configure_logging
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.middleware import (
+    IdempotencyMiddleware,
+    MetricsMiddleware,
+    ProfilingMiddleware,
+    QueryStatsMiddleware,
+    RateLimitMiddleware,
+    ReadYourWritesMiddleware,
+)
+from app.core.profiling import PROFILE_HEADER, PROFILES_PATH, get_profile, profiling_authorized
 from app.routers import auth, user, barber, booking
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+configure_logging()
 
+# Şema değişiklikleri Alembic ile yapılır (alembic upgrade head); uygulama açılışında DDL çalışmaz
 app = FastAPI()
 
-# CORS middleware
+# SQL sorgu sayısı / süresi ölçümü
+app.add_middleware(QueryStatsMiddleware)
+# Kendi yazmasından hemen sonra okuyan istemciyi birincil veritabanına sabitle
+app.add_middleware(ReadYourWritesMiddleware)
+# Pahalı rotalar için hız ve eşzamanlılık sınırı; reddedilen istek DB oturumu açmaz
+app.add_middleware(RateLimitMiddleware)
+# Idempotency-Key ile tekrarlanan POST'lar: tekrar oynatma hız sınırına takılmaz, handler yeniden çalışmaz
+app.add_middleware(IdempotencyMiddleware)
+# Yetkili X-Profile başlığıyla gelen isteği örnekle
+app.add_middleware(ProfilingMiddleware)
+# Gecikme, durum kodu ve eşzamanlı istek metrikleri (/metrics)
+app.add_middleware(MetricsMiddleware)
+
+# CORS middleware - en dışta, böylece 429/503 gibi erken yanıtlar da CORS başlığı taşır
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "http://localhost:3001"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Tarayıcı istemcileri sayfalama imlecini okuyabilsin
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Include routers
@@ -29,6 +59,24 @@ app.include_router(booking.router, prefix="/api/v1", tags=["bookings"])
 def read_root():
     return {"message": "Barber Booking API"}
 
+@app.get("/api/v1/cache/stats")
+def read_cache_stats():
+    return cache_stats()
+
+@app.get("/metrics", include_in_schema=False)
+def read_metrics():
+    return PlainTextResponse(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.get(PROFILES_PATH + "/{profile_id}", include_in_schema=False)
+def read_profile(profile_id: str, token: Optional[str] = Header(None, alias=PROFILE_HEADER)):
+    if not profiling_authorized(token):
+        raise HTTPException(status_code=404, detail="Not found")
+    profile = get_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    # Folded stack biçimi: flamegraph.pl veya speedscope ile açılabilir
+    return PlainTextResponse(profile)
+
 # Dependency
 def get_db():
     db = SessionLocal()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Time, Float, Text
+from sqlalchemy import Column, Integer, String, Boolean, Date, DateTime, ForeignKey, Time, Float, Text, Index, LargeBinary
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import time
@@ -7,6 +7,12 @@ from app.core.database import Base
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Berber listesi: is_barber filtresi + id sıralaması (keyset)
+        Index("ix_users_is_barber_id", "is_barber", "id"),
+        # Yakındaki berberler: geohash önek aralığı taraması
+        Index("ix_users_geohash", "geohash"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
@@ -21,13 +27,23 @@ class User(Base):
     barber_bio = Column(Text, nullable=True)
     barber_shop_name = Column(String, nullable=True)
     barber_shop_address = Column(String, nullable=True)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    # latitude/longitude'dan türetilir (app.core.geo.encode); yalnızca konumu olan berberlerde dolu
+    geohash = Column(String(12), nullable=True)
+    # Profil/servis/çalışma saati değiştikçe artar; herkese açık katalog ETag'lerinin kaynağı
+    catalog_version = Column(Integer, nullable=False, default=1, server_default="1")
     
     services = relationship("Service", back_populates="barber")
     working_hours = relationship("WorkingHours", back_populates="barber")
+    schedule_exceptions = relationship("ScheduleException", back_populates="barber")
     bookings = relationship("Booking", back_populates="barber")
 
 class Service(Base):
     __tablename__ = "services"
+    __table_args__ = (
+        Index("ix_services_barber_id", "barber_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
@@ -41,6 +57,9 @@ class Service(Base):
 
 class WorkingHours(Base):
     __tablename__ = "working_hours"
+    __table_args__ = (
+        Index("ix_working_hours_barber_day", "barber_id", "day_of_week"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     day_of_week = Column(Integer)  # 0-6 (Monday-Sunday)
@@ -51,8 +70,30 @@ class WorkingHours(Base):
     
     barber = relationship("User", back_populates="working_hours")
 
+class ScheduleException(Base):
+    """Per-date override: extra hours (is_working) or closed time; no times = the whole day"""
+    __tablename__ = "schedule_exceptions"
+    __table_args__ = (
+        Index("ix_schedule_exceptions_barber_date", "barber_id", "date"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    date = Column(Date, nullable=False)
+    start_time = Column(Time, nullable=True)
+    end_time = Column(Time, nullable=True)
+    is_working = Column(Boolean, default=False)
+    note = Column(String, nullable=True)
+    barber_id = Column(Integer, ForeignKey("users.id"))
+
+    barber = relationship("User", back_populates="schedule_exceptions")
+
 class Booking(Base):
     __tablename__ = "bookings"
+    __table_args__ = (
+        # Müsaitlik, çakışma kontrolü ve berber randevu listesi
+        Index("ix_bookings_barber_start_status", "barber_id", "start_time", "status"),
+        Index("ix_bookings_customer_email", "customer_email"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     customer_name = Column(String)
@@ -62,9 +103,36 @@ class Booking(Base):
     end_time = Column(DateTime)
     notes = Column(Text, nullable=True)
     status = Column(String, default="confirmed")  # confirmed, cancelled, completed
+    price = Column(Float, nullable=True)  # randevu anındaki servis fiyatı (günlük toplamlar bunu kullanır)
     barber_id = Column(Integer, ForeignKey("users.id"))
     service_id = Column(Integer, ForeignKey("services.id"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     barber = relationship("User", back_populates="bookings")
-    service = relationship("Service", back_populates="bookings")
\ No newline at end of file
+    service = relationship("Service", back_populates="bookings")
+
+class IdempotencyKey(Base):
+    """Claimed Idempotency-Key and, once the request finished, its stored response"""
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
+
+    key = Column(String(64), primary_key=True)  # sha256(rota, istemci, anahtar)
+    fingerprint = Column(String(64), nullable=False)  # istek gövdesinin sha256'sı
+    status_code = Column(Integer, nullable=True)  # NULL = istek hâlâ çalışıyor
+    response_headers = Column(Text, nullable=True)
+    response_body = Column(LargeBinary, nullable=True)
+    locked_until = Column(DateTime, nullable=True)
+    expires_at = Column(DateTime, nullable=False)
+
+class BarberDailyStats(Base):
+    """Per barber and day (booking start date) rollup, maintained with every booking write"""
+    __tablename__ = "barber_daily_stats"
+
+    barber_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    bookings = Column(Integer, nullable=False, default=0)  # onaylı (iptal edilmemiş) randevular
+    cancellations = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)  # onaylı randevuların Service.price toplamı
+    booked_minutes = Column(Integer, nullable=False, default=0)
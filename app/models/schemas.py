@@ -1,6 +1,6 @@
 from datetime import datetime, time, date
 from typing import Optional, List
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, root_validator, validator
 
 class Token(BaseModel):
     access_token: str
@@ -25,14 +25,18 @@ class User(UserBase):
     
     class Config:
         from_attributes = True
+        orm_mode = True
 
 class Barber(User):
     barber_bio: Optional[str] = None
     barber_shop_name: Optional[str] = None
     barber_shop_address: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     
     class Config:
         from_attributes = True
+        orm_mode = True
 
 class ServiceBase(BaseModel):
     name: str
@@ -49,6 +53,7 @@ class Service(ServiceBase):
     
     class Config:
         from_attributes = True
+        orm_mode = True
 
 class WorkingHoursBase(BaseModel):
     day_of_week: int
@@ -56,8 +61,20 @@ class WorkingHoursBase(BaseModel):
     end_time: time
     is_working: bool = True
 
+# Doğrulama yalnızca girişte: kurallardan önce yazılmış satırlar okunurken hata vermez
 class WorkingHoursCreate(WorkingHoursBase):
-    pass
+    @validator("day_of_week")
+    def check_day_of_week(cls, v):
+        if not 0 <= v <= 6:
+            raise ValueError("day_of_week must be between 0 (Monday) and 6 (Sunday)")
+        return v
+
+    @root_validator(skip_on_failure=True)
+    def check_interval(cls, values):
+        # Kapalı gün saatsiz gönderilemez; eşit saatlerle (00:00-00:00) gelmesi kabul edilir
+        if values["is_working"] and values["end_time"] <= values["start_time"]:
+            raise ValueError("end_time must be after start_time")
+        return values
 
 class WorkingHours(WorkingHoursBase):
     id: int
@@ -65,6 +82,35 @@ class WorkingHours(WorkingHoursBase):
     
     class Config:
         from_attributes = True
+        orm_mode = True
+
+class ScheduleExceptionBase(BaseModel):
+    # Saat verilmezse bütün gün; is_working=False kapalı, True ek çalışma saati
+    start_time: Optional[time] = None
+    end_time: Optional[time] = None
+    is_working: bool = False
+    note: Optional[str] = None
+
+    @root_validator(skip_on_failure=True)
+    def check_interval(cls, values):
+        start, end = values.get("start_time"), values.get("end_time")
+        if (start is None) != (end is None):
+            raise ValueError("start_time and end_time must be given together")
+        if start is not None and end <= start:
+            raise ValueError("end_time must be after start_time")
+        return values
+
+class ScheduleExceptionCreate(ScheduleExceptionBase):
+    pass
+
+class ScheduleException(ScheduleExceptionBase):
+    id: int
+    barber_id: int
+    date: date
+
+    class Config:
+        from_attributes = True
+        orm_mode = True
 
 class BookingBase(BaseModel):
     customer_name: str
@@ -86,6 +132,59 @@ class Booking(BookingBase):
     
     class Config:
         from_attributes = True
+        orm_mode = True
+
+class RecurrenceRule(BaseModel):
+    start_time: datetime
+    frequency: str = "weekly"  # daily, weekly
+    interval: int = 1  # 2 = iki haftada bir
+    count: Optional[int] = None
+    until: Optional[date] = None
+
+    @validator("frequency")
+    def check_frequency(cls, v):
+        if v not in ("daily", "weekly"):
+            raise ValueError("frequency must be 'daily' or 'weekly'")
+        return v
+
+    @validator("interval")
+    def check_interval(cls, v):
+        if v < 1:
+            raise ValueError("interval must be at least 1")
+        return v
+
+    @root_validator(skip_on_failure=True)
+    def check_end(cls, values):
+        if values.get("count") is None and values.get("until") is None:
+            raise ValueError("either count or until is required")
+        return values
+
+class BulkBookingCreate(BaseModel):
+    customer_name: str
+    customer_email: EmailStr
+    customer_phone: str
+    service_id: int
+    notes: Optional[str] = None
+    start_times: List[datetime] = []
+    recurrence: Optional[RecurrenceRule] = None
+
+    @root_validator(skip_on_failure=True)
+    def check_occurrences(cls, values):
+        if not values.get("start_times") and values.get("recurrence") is None:
+            raise ValueError("start_times or recurrence is required")
+        return values
+
+class BookingOccurrence(BaseModel):
+    start_time: datetime
+    end_time: datetime
+    status: str  # accepted, rejected
+    reason: Optional[str] = None
+    booking_id: Optional[int] = None
+
+class BulkBookingResult(BaseModel):
+    accepted: int
+    rejected: int
+    occurrences: List[BookingOccurrence]
 
 class BarberWithServicesAndHours(Barber):
     services: List[Service] = []
@@ -93,7 +192,26 @@ class BarberWithServicesAndHours(Barber):
     
     class Config:
         from_attributes = True
+        orm_mode = True
 
 class AvailableSlots(BaseModel):
     date: date
-    available_times: List[datetime]
\ No newline at end of file
+    available_times: List[datetime]
+
+class BarberNearby(Barber):
+    distance_km: float
+
+class BarberStatsPeriod(BaseModel):
+    start: date
+    end: date
+    bookings: int = 0
+    cancellations: int = 0
+    revenue: float = 0.0
+    booked_minutes: int = 0
+    scheduled_minutes: int = 0
+    utilization: Optional[float] = None  # booked_minutes / scheduled_minutes (çalışma yoksa None)
+
+class BarberAvailability(BaseModel):
+    barber: Barber
+    service: Service
+    available_times: List[datetime]
@@ -1,60 +1,57 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 from typing import Annotated
 
 from app.core import security
 from app.core.config import settings
-from app.crud.crud_user import create_user, get_user_by_email
+from app.crud.crud_user import create_user_async, get_user_by_email_async, update_password_hash_async
 from app.models.schemas import UserCreate, Token, User
-from app.models.models import User as DBUser
-from app.core.database import get_db
+from app.core.database import get_async_db
 
 router = APIRouter(tags=["auth"])
 
-async def get_current_user(
-    token: Annotated[str, Depends(security.oauth2_scheme)],
-    db: Session = Depends(get_db)
-) -> DBUser:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        email = security.verify_token(token, credentials_exception)
-        user = get_user_by_email(db, email=email)
-        if user is None:
-            raise credentials_exception
-        return user
-    except Exception as e:
-        raise credentials_exception
+logger = logging.getLogger(__name__)
 
 # auth.py'de register endpointi kontrolü
 @router.post("/register")
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
-    print("Gelen veri:", user_data)  # Gelen veriyi logla
-    db_user = get_user_by_email(db, email=user_data.email)
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    # Parola asla loglanmaz; yalnızca e-posta ve rol
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("register attempt", extra={"email": user_data.email, "is_barber": user_data.is_barber})
+    db_user = await get_user_by_email_async(db, email=user_data.email)
     if db_user:
-        print("Email zaten kayıtlı")  # Debug log
+        logger.info("register rejected: email already registered", extra={"email": user_data.email})
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    user = create_user(db, user_data)
-    print("Oluşturulan kullanıcı:", user.id)  # Debug log
+    user = await create_user_async(db, user_data)
+    logger.info("user registered", extra={"user_id": user.id})
     return {"status": "success", "id": user.id}
 
 @router.post("/login", response_model=Token)
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    user = get_user_by_email(db, email=form_data.username)
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
+    user = await get_user_by_email_async(db, email=form_data.username)
+    if not user:
+        raise HTTPException(
+            status_code=400,
+            detail="Incorrect email or password"
+        )
+
+    valid, new_hash = await security.verify_password_async(form_data.password, user.hashed_password)
+    if not valid:
         raise HTTPException(
             status_code=400,
             detail="Incorrect email or password"
         )
+    if new_hash:
+        # bcrypt maliyeti değişti: hash'i sessizce güncelle
+        await update_password_hash_async(db, user, new_hash)
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = security.create_access_token(
@@ -65,6 +62,6 @@ async def login_for_access_token(
 
 @router.get("/me", response_model=User)
 async def read_current_user(
-    current_user: Annotated[DBUser, Depends(get_current_user)]
+    current_user: Annotated[security.Principal, Depends(security.get_current_user)]
 ):
     return current_user
\ No newline at end of file
@@ -1,36 +1,146 @@
-from fastapi import APIRouter, Depends, HTTPException
+from functools import partial
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import date, datetime, time
 
-from app.core.database import get_db
+from app.core.availability import availability_cache, availability_tags
+from app.core.conditional import cache_headers, catalog_etag, not_modified
+from app.core.config import settings
+from app.core.database import SessionLocal, get_db
+from app.core.events import slot_changes, slot_diff_stream
+from app.core.replicas import get_read_db
+from app.core.export import EXPORT_MEDIA_TYPES, EXPORT_WRITERS
+from app.core.fastjson import fast_json_response, schema_columns
+from app.core.pagination import decode_cursor, set_next_cursor
 from app.core.security import get_current_active_user
 from app.crud.crud_barber import (
+    get_barber_catalog_version,
     get_barber_services,
     create_barber_service,
     get_barber_working_hours,
     update_barber_working_hours,
-    update_barber_profile
+    update_barber_profile,
+    get_nearby_barbers,
+    get_schedule_exceptions,
+    get_compiled_schedule,
+    replace_schedule_exceptions,
+    delete_schedule_exceptions
+)
+from app.crud.crud_stats import get_daily_stats, summarize_stats
+from app.crud.crud_user import get_barber_full
+from app.crud.crud_booking import (
+    get_available_slots,
+    get_available_slots_range,
+    search_available_barbers,
+    get_bookings,
+    iter_booking_export_batches,
+    EXPORT_COLUMNS
 )
 from app.models.schemas import (
     Service,
     ServiceCreate,
     WorkingHours,
     WorkingHoursCreate,
-    Barber
+    ScheduleException,
+    ScheduleExceptionCreate,
+    Barber,
+    BarberWithServicesAndHours,
+    AvailableSlots,
+    BarberAvailability,
+    BarberNearby,
+    BarberStatsPeriod,
+    Booking
 )
-from app.models.models import User
+from app.models.models import User, Booking as BookingModel
 
 router = APIRouter()
 
+@router.get("/barbers/available", response_model=List[BarberAvailability])
+def search_barbers_availability(
+    selected_date: date = Query(..., alias="date"),
+    time_from: Optional[time] = None,
+    time_to: Optional[time] = None,
+    service: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    if time_from and time_to and time_to < time_from:
+        raise HTTPException(status_code=400, detail="'time_to' must not be before 'time_from'")
+
+    return search_available_barbers(
+        db,
+        selected_date=selected_date,
+        time_from=time_from,
+        time_to=time_to,
+        service_name=service
+    )
+
+@router.get("/barbers/nearby", response_model=List[BarberNearby])
+def read_nearby_barbers(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius: float = Query(5, gt=0, description="Search radius in km"),
+    q: Optional[str] = Query(None, min_length=1, description="Filter on barber or shop name"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db)
+):
+    if radius > settings.NEARBY_MAX_RADIUS_KM:
+        raise HTTPException(
+            status_code=400,
+            detail=f"'radius' must not exceed {settings.NEARBY_MAX_RADIUS_KM:g} km"
+        )
+
+    results = get_nearby_barbers(db, latitude=lat, longitude=lon, radius_km=radius, q=q, limit=limit)
+    return [
+        BarberNearby(**Barber.from_orm(barber).dict(), distance_km=round(distance, 3))
+        for barber, distance in results
+    ]
+
 @router.get("/barbers/{barber_id}", response_model=Barber)
-def read_barber(barber_id: int, db: Session = Depends(get_db)):
+def read_barber(barber_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
+    # Önce yalnızca sürüm okunur; istemcideki kopya güncelse tam sorgu/serileştirme yapılmaz
+    version = get_barber_catalog_version(db, barber_id=barber_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Barber not found")
+    etag = catalog_etag(barber_id, version, "profile")
+    unchanged = not_modified(request, etag)
+    if unchanged:
+        return unchanged
+
     barber = db.query(User).filter(User.id == barber_id, User.is_barber == True).first()
     if not barber:
         raise HTTPException(status_code=404, detail="Barber not found")
+    response.headers.update(cache_headers(etag))
+    return barber
+
+@router.get("/barbers/{barber_id}/full", response_model=BarberWithServicesAndHours)
+def read_barber_full(barber_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
+    version = get_barber_catalog_version(db, barber_id=barber_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Barber not found")
+    etag = catalog_etag(barber_id, version, "full")
+    unchanged = not_modified(request, etag)
+    if unchanged:
+        return unchanged
+
+    # Profil, servisler ve çalışma saatleri tek istekte, sabit sayıda sorguyla
+    barber = get_barber_full(db, barber_id=barber_id)
+    if not barber:
+        raise HTTPException(status_code=404, detail="Barber not found")
+    response.headers.update(cache_headers(etag))
     return barber
 
 @router.get("/barbers/{barber_id}/services", response_model=List[Service])
-def read_barber_services(barber_id: int, db: Session = Depends(get_db)):
+def read_barber_services(barber_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
+    version = get_barber_catalog_version(db, barber_id=barber_id)
+    if version is not None:
+        etag = catalog_etag(barber_id, version, "services")
+        unchanged = not_modified(request, etag)
+        if unchanged:
+            return unchanged
+        response.headers.update(cache_headers(etag))
     return get_barber_services(db, barber_id=barber_id)
 
 @router.post("/barbers/{barber_id}/services", response_model=Service)
@@ -46,7 +156,14 @@ def add_barber_service(
     return create_barber_service(db=db, service=service, barber_id=barber_id)
 
 @router.get("/barbers/{barber_id}/working-hours", response_model=List[WorkingHours])
-def read_barber_working_hours(barber_id: int, db: Session = Depends(get_db)):
+def read_barber_working_hours(barber_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
+    version = get_barber_catalog_version(db, barber_id=barber_id)
+    if version is not None:
+        etag = catalog_etag(barber_id, version, "working-hours")
+        unchanged = not_modified(request, etag)
+        if unchanged:
+            return unchanged
+        response.headers.update(cache_headers(etag))
     return get_barber_working_hours(db, barber_id=barber_id)
 
 @router.put("/barbers/{barber_id}/working-hours", response_model=List[WorkingHours])
@@ -61,22 +178,209 @@ def set_barber_working_hours(
     
     return update_barber_working_hours(db=db, barber_id=barber_id, working_hours=working_hours)
 
+@router.get("/barbers/{barber_id}/schedule-exceptions", response_model=List[ScheduleException])
+def read_barber_schedule_exceptions(
+    barber_id: int,
+    request: Request,
+    response: Response,
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    db: Session = Depends(get_read_db)
+):
+    version = get_barber_catalog_version(db, barber_id=barber_id)
+    if version is not None:
+        etag = catalog_etag(barber_id, version, f"schedule-exceptions-{from_date}-{to_date}")
+        unchanged = not_modified(request, etag)
+        if unchanged:
+            return unchanged
+        response.headers.update(cache_headers(etag))
+    return get_schedule_exceptions(db, barber_id=barber_id, start_date=from_date, end_date=to_date)
+
+@router.put("/barbers/{barber_id}/schedule-exceptions/{day}", response_model=List[ScheduleException])
+def set_barber_schedule_exceptions(
+    barber_id: int,
+    day: date,
+    exceptions: List[ScheduleExceptionCreate],
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    if current_user.id != barber_id or not current_user.is_barber:
+        raise HTTPException(status_code=403, detail="Only the barber can set schedule exceptions")
+
+    return replace_schedule_exceptions(db=db, barber_id=barber_id, day=day, exceptions=exceptions)
+
+@router.delete("/barbers/{barber_id}/schedule-exceptions/{day}", status_code=204)
+def remove_barber_schedule_exceptions(
+    barber_id: int,
+    day: date,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    if current_user.id != barber_id or not current_user.is_barber:
+        raise HTTPException(status_code=403, detail="Only the barber can remove schedule exceptions")
+
+    if not delete_schedule_exceptions(db=db, barber_id=barber_id, day=day):
+        raise HTTPException(status_code=404, detail="No schedule exceptions on this date")
+    return Response(status_code=204)
+
+# Birincilden okunur: sonuç önbelleğe yazılır, gecikmeli replika eski slotları önbelleğe koyabilir
+@router.get("/barbers/{barber_id}/availability", response_model=List[AvailableSlots])
+def read_barber_availability(
+    barber_id: int,
+    service_id: int,
+    from_date: date = Query(..., alias="from"),
+    to_date: date = Query(..., alias="to"),
+    db: Session = Depends(get_db)
+):
+    if to_date < from_date:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    if (to_date - from_date).days + 1 > settings.AVAILABILITY_MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Date range cannot exceed {settings.AVAILABILITY_MAX_RANGE_DAYS} days"
+        )
+
+    slots = get_available_slots_range(
+        db,
+        barber_id=barber_id,
+        service_id=service_id,
+        start_date=from_date,
+        end_date=to_date
+    )
+    if slots is None:
+        raise HTTPException(status_code=404, detail="Service not found")
+    return slots
+
+def _day_slots(barber_id: int, service_id: int, day: date) -> Optional[List[datetime]]:
+    # Akış uzun yaşar: istek boyunca oturum tutmak yerine her hesaplamada kısa bir oturum
+    db = SessionLocal()
+    try:
+        slots = get_available_slots(db, barber_id=barber_id, service_id=service_id, selected_date=day)
+        return None if slots is None else slots.available_times
+    finally:
+        db.close()
+
+@router.get("/barbers/{barber_id}/availability/stream")
+async def stream_barber_availability(
+    barber_id: int,
+    service_id: int,
+    selected_date: date = Query(..., alias="date")
+):
+    """Live slots of one day as server-sent events instead of polling /availability"""
+    # Önce abone ol: ilk hesaplama ile abonelik arasındaki değişiklik kaçmaz
+    subscription = slot_changes.subscribe(barber_id, selected_date)
+    load_slots = partial(run_in_threadpool, _day_slots, barber_id, service_id, selected_date)
+    try:
+        initial = await load_slots()
+    except BaseException:
+        # Veritabanı hatası ya da iptal: abonelik broker'da asılı kalmasın
+        slot_changes.unsubscribe(subscription)
+        raise
+    if initial is None:
+        slot_changes.unsubscribe(subscription)
+        raise HTTPException(status_code=404, detail="Service not found")
+
+    tags = availability_tags(barber_id, selected_date)
+    return StreamingResponse(
+        slot_diff_stream(subscription, initial, load_slots, watch=partial(availability_cache.snapshot, tags)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Birincilden okunur: derlenmiş takvim önbelleğe yazılır (bkz. availability)
+@router.get("/barbers/{barber_id}/stats", response_model=List[BarberStatsPeriod])
+def read_barber_stats(
+    barber_id: int,
+    from_date: date = Query(..., alias="from"),
+    to_date: date = Query(..., alias="to"),
+    granularity: str = Query("day", regex="^(day|week|month)$"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    if current_user.id != barber_id or not current_user.is_barber:
+        raise HTTPException(status_code=403, detail="Only the barber can view their stats")
+    if to_date < from_date:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    if (to_date - from_date).days + 1 > settings.STATS_MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Date range cannot exceed {settings.STATS_MAX_RANGE_DAYS} days"
+        )
+
+    # Yalnızca günlük toplamlar ve derlenmiş takvim okunur; randevu tablosu taranmaz
+    rows = get_daily_stats(db, barber_id=barber_id, start_date=from_date, end_date=to_date)
+    schedule = get_compiled_schedule(db, barber_id)
+    return summarize_stats(rows, schedule, from_date, to_date, granularity)
+
+@router.get("/barbers/{barber_id}/bookings", response_model=List[Booking])
+def read_barber_bookings(
+    barber_id: int,
+    response: Response,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    if current_user.id != barber_id or not current_user.is_barber:
+        raise HTTPException(status_code=403, detail="Only the barber can list bookings")
+
+    cursor = decode_cursor(after, (datetime.fromisoformat, int))
+    if settings.FAST_JSON_RESPONSES:
+        rows = get_bookings(
+            db, barber_id=barber_id, skip=skip, limit=limit, after=cursor,
+            columns=schema_columns(Booking, BookingModel)
+        )
+        set_next_cursor(response, rows, limit, key=lambda b: (b.start_time, b.id))
+        return fast_json_response(rows, Booking, response=response)
+
+    bookings = get_bookings(db, barber_id=barber_id, skip=skip, limit=limit, after=cursor)
+    set_next_cursor(response, bookings, limit, key=lambda b: (b.start_time, b.id))
+    return bookings
+
+@router.get("/barbers/{barber_id}/bookings/export")
+def export_barber_bookings(
+    barber_id: int,
+    export_format: str = Query("csv", alias="format", regex="^(csv|ndjson)$"),
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    if current_user.id != barber_id or not current_user.is_barber:
+        raise HTTPException(status_code=403, detail="Only the barber can export bookings")
+
+    # Satırlar parça parça akar: bellek kullanımı sabit, ilk bayt sorgu bitmeden gider
+    batches = iter_booking_export_batches(db, barber_id=barber_id, start_date=from_date, end_date=to_date)
+    columns = [column.key for column in EXPORT_COLUMNS]
+    return StreamingResponse(
+        EXPORT_WRITERS[export_format](columns, batches),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="bookings-{barber_id}.{export_format}"'}
+    )
+
 @router.put("/barbers/{barber_id}/profile")
 def update_profile(
     barber_id: int,
     bio: str,
     shop_name: str,
     shop_address: str,
+    latitude: Optional[float] = Query(None, ge=-90, le=90),
+    longitude: Optional[float] = Query(None, ge=-180, le=180),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     if current_user.id != barber_id or not current_user.is_barber:
         raise HTTPException(status_code=403, detail="Only the barber can update profile")
+    if (latitude is None) != (longitude is None):
+        raise HTTPException(status_code=400, detail="'latitude' and 'longitude' must be given together")
     
     return update_barber_profile(
         db=db,
         barber_id=barber_id,
         bio=bio,
         shop_name=shop_name,
-        shop_address=shop_address
+        shop_address=shop_address,
+        latitude=latitude,
+        longitude=longitude
     )
\ No newline at end of file
@@ -1,33 +1,34 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import date
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_async_db, get_db
+from app.core.locks import BookingConflictError, conflict_headers
 from app.core.security import get_current_active_user
-from app.crud.crud_booking import (
-    get_bookings,
-    get_customer_bookings,
-    create_booking,
-    cancel_booking,
-    get_available_slots
-)
-from app.models.schemas import Booking, BookingCreate, AvailableSlots
-from app.models.models import User, Booking as BookingModel  # Booking modelini import edin
+from app.crud.crud_booking import create_booking_async, create_bookings_bulk, expand_recurrence
+from app.models.schemas import Booking, BookingCreate, AvailableSlots, BulkBookingCreate, BulkBookingResult
+from app.models.models import User, Service
 
 router = APIRouter(prefix="/bookings", tags=["bookings"])
 
 @router.post("/bookings", response_model=Booking, status_code=status.HTTP_201_CREATED)
 async def create_booking(
     booking: BookingCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    # Berber kontrolü
-    barber = db.query(User).filter(
-        User.id == booking.barber_id,
-        User.is_barber == True
-    ).first()
+    # Berber kontrolü (berber, seçilen servisin sahibidir)
+    result = await db.execute(
+        select(User).join(Service, Service.barber_id == User.id).where(
+            Service.id == booking.service_id,
+            User.is_barber == True
+        )
+    )
+    barber = result.scalars().first()
     if not barber:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -43,9 +44,56 @@ async def create_booking(
     })
 
     try:
-        return create_booking(db=db, booking_data=booking_data)
+        return await create_booking_async(db=db, booking_data=booking_data)
+    except BookingConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+            headers=conflict_headers(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
-        )
\ No newline at end of file
+        )
+
+@router.post("/bulk", response_model=BulkBookingResult, status_code=status.HTTP_201_CREATED)
+def create_bulk_bookings(
+    bookings: BulkBookingCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    # Açık liste ve tekrar kuralı birleştirilir
+    start_times = list(bookings.start_times)
+    try:
+        if bookings.recurrence is not None:
+            start_times += expand_recurrence(bookings.recurrence, settings.BULK_BOOKING_MAX_OCCURRENCES)
+        if len(start_times) > settings.BULK_BOOKING_MAX_OCCURRENCES:
+            raise ValueError(f"At most {settings.BULK_BOOKING_MAX_OCCURRENCES} occurrences per request")
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    booking_data = {
+        "service_id": bookings.service_id,
+        "notes": bookings.notes,
+        "customer_email": current_user.email,
+        "customer_name": current_user.full_name or bookings.customer_name,
+        "customer_phone": current_user.phone_number or bookings.customer_phone
+    }
+
+    try:
+        return create_bookings_bulk(db=db, booking_data=booking_data, start_times=start_times)
+    except BookingConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+            headers=conflict_headers(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
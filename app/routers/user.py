@@ -1,11 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app.core.database import get_db
+from app.core.replicas import get_read_db
+from app.core.config import settings
+from app.core.fastjson import fast_json_response, schema_columns
+from app.core.pagination import decode_cursor, set_next_cursor, NEXT_CURSOR_HEADER
 from app.core.security import get_current_active_user
-from app.crud.crud_user import get_user, get_user_by_email, get_users, create_user,get_barbers
-from app.models.schemas import User, UserCreate, Barber
+from app.crud.crud_user import get_user, get_user_by_email, get_users, create_user, get_barbers, BARBER_EXPANDABLE
+from app.models.schemas import User, UserCreate, Barber, Service, WorkingHours
+from app.models import models
 
 router = APIRouter()
 
@@ -21,11 +28,68 @@ async def read_users_me(current_user: User = Depends(get_current_active_user)):
     return current_user
 
 @router.get("/users", response_model=List[User])
-def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    users = get_users(db, skip=skip, limit=limit)
+def read_users(
+    response: Response,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    cursor = decode_cursor(after, (int,))
+    if settings.FAST_JSON_RESPONSES:
+        rows = get_users(
+            db, skip=skip, limit=limit, after_id=cursor[0] if cursor else None,
+            columns=schema_columns(User, models.User)
+        )
+        set_next_cursor(response, rows, limit, key=lambda u: (u.id,))
+        return fast_json_response(rows, User, response=response)
+
+    users = get_users(db, skip=skip, limit=limit, after_id=cursor[0] if cursor else None)
+    set_next_cursor(response, users, limit, key=lambda u: (u.id,))
     return users
 
+EXPANDED_SCHEMAS = {
+    "services": Service,
+    "working_hours": WorkingHours,
+}
+
 @router.get("/barbers", response_model=List[Barber])
-def read_barbers(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    barbers = get_barbers(db, skip=skip, limit=limit)
-    return barbers
\ No newline at end of file
+def read_barbers(
+    response: Response,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = None,
+    expand: Optional[str] = Query(None, description="Comma separated: services,working_hours"),
+    db: Session = Depends(get_read_db)
+):
+    expanded = [name.strip() for name in expand.split(",") if name.strip()] if expand else []
+    unknown = set(expanded) - set(BARBER_EXPANDABLE)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Cannot expand: {', '.join(sorted(unknown))}")
+
+    cursor = decode_cursor(after, (int,))
+    if settings.FAST_JSON_RESPONSES and not expanded:
+        rows = get_barbers(
+            db, skip=skip, limit=limit, after_id=cursor[0] if cursor else None,
+            columns=schema_columns(Barber, models.User)
+        )
+        set_next_cursor(response, rows, limit, key=lambda b: (b.id,))
+        return fast_json_response(rows, Barber, response=response)
+
+    barbers = get_barbers(db, skip=skip, limit=limit, after_id=cursor[0] if cursor else None, expand=expanded)
+    set_next_cursor(response, barbers, limit, key=lambda b: (b.id,))
+    if not expanded:
+        return barbers
+
+    # Yalnızca istenen ilişkiler serileştirilir (diğerlerine dokunmak lazy load tetiklerdi)
+    content = []
+    for barber in barbers:
+        item = Barber.from_orm(barber).dict()
+        for name in expanded:
+            schema = EXPANDED_SCHEMAS[name]
+            item[name] = [schema.from_orm(row).dict() for row in getattr(barber, name)]
+        content.append(item)
+    headers = {}
+    if NEXT_CURSOR_HEADER in response.headers:
+        headers[NEXT_CURSOR_HEADER] = response.headers[NEXT_CURSOR_HEADER]
+    return JSONResponse(content=jsonable_encoder(content), headers=headers)
\ No newline at end of file
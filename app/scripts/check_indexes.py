@@ -0,0 +1,89 @@
+"""
+Hot-path index report.
+
+Runs the read queries of app/crud/* against the configured database, captures the
+exact SQL they issue and EXPLAINs each statement. Statements whose plan contains a
+full table scan are reported; the exit code is 1 when any are found so CI can gate on it.
+
+    python -m app.scripts.check_indexes
+"""
+import sys
+from datetime import date, datetime, timedelta
+from typing import Callable, List, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.availability import availability_cache
+from app.core.database import SessionLocal, track_queries
+from app.crud import crud_barber, crud_booking, crud_user
+from app.models.models import Base, Service
+
+PROBE_EMAIL = "index-probe@example.com"
+
+
+def hot_queries(db: Session) -> List[Tuple[str, Callable[[], object]]]:
+    service = db.query(Service).first()
+    barber_id = service.barber_id if service else 1
+    service_id = service.id if service else 1
+    today = date.today()
+    return [
+        ("crud_user.get_user_by_email", lambda: crud_user.get_user_by_email(db, PROBE_EMAIL)),
+        ("crud_user.get_users", lambda: crud_user.get_users(db, after_id=0)),
+        ("crud_user.get_barbers", lambda: crud_user.get_barbers(db, after_id=0)),
+        ("crud_barber.get_barber_services", lambda: crud_barber.get_barber_services(db, barber_id)),
+        ("crud_barber.get_barber_working_hours", lambda: crud_barber.get_barber_working_hours(db, barber_id)),
+        ("crud_barber.get_schedule_exceptions", lambda: crud_barber.get_schedule_exceptions(
+            db, barber_id, today, today + timedelta(days=13))),
+        ("crud_barber.get_nearby_barbers", lambda: crud_barber.get_nearby_barbers(db, 41.0082, 28.9784, 5)),
+        ("crud_booking.get_bookings", lambda: crud_booking.get_bookings(db, barber_id, after=(datetime(2000, 1, 1), 0))),
+        ("crud_booking.get_customer_bookings", lambda: crud_booking.get_customer_bookings(db, PROBE_EMAIL)),
+        ("crud_booking.get_available_slots_range", lambda: crud_booking.get_available_slots_range(
+            db, barber_id, service_id, today, today + timedelta(days=13))),
+        ("crud_booking.search_available_barbers", lambda: crud_booking.search_available_barbers(db, today)),
+    ]
+
+
+def full_scans(db: Session, statement: str, parameters) -> List[str]:
+    """Plan lines that read a whole table"""
+    connection = db.connection()
+    if connection.dialect.name == "postgresql":
+        # Seq scan kapalıyken hâlâ Seq Scan çıkıyorsa kullanılabilir bir indeks yoktur
+        connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        rows = connection.exec_driver_sql("EXPLAIN " + statement, parameters).fetchall()
+        return [row[0].strip() for row in rows if "Seq Scan" in row[0]]
+    if connection.dialect.name == "sqlite":
+        rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+        # "SCAN CONSTANT ROW" / "SCAN (subquery-1)" gibi satırlar tablo taraması değildir
+        return [
+            row[-1] for row in rows
+            if row[-1].startswith("SCAN ") and "USING" not in row[-1]
+            and row[-1].split()[1] in Base.metadata.tables
+        ]
+    raise RuntimeError(f"EXPLAIN is not supported for dialect {connection.dialect.name}")
+
+
+def main() -> int:
+    availability_cache.clear()
+    db = SessionLocal()
+    missing = 0
+    try:
+        for name, run in hot_queries(db):
+            with track_queries(keep_statements=True) as stats:
+                run()
+            for statement, parameters in stats.statements:
+                scans = full_scans(db, statement, parameters)
+                if scans:
+                    missing += 1
+                    print(f"NO INDEX  {name}: {'; '.join(scans)}")
+                    print(f"          {' '.join(statement.split())}")
+                else:
+                    print(f"ok        {name}")
+    finally:
+        db.rollback()
+        db.close()
+    print(f"\n{missing} statement(s) without a usable index")
+    return 1 if missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
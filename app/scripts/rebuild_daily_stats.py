@@ -0,0 +1,169 @@
+"""
+Backfill / repair of the barber_daily_stats rollups.
+
+Recomputes the rollups from the bookings table in batches of barbers. Each
+batch is one transaction that holds the barbers' booking write locks, so live
+bookings of those barbers wait for it instead of being lost or double counted.
+With --check nothing is written; differing days are reported and the exit
+code is 1 when any are found.
+
+    python -m app.scripts.rebuild_daily_stats [--from 2024-01-01] [--to 2024-12-31]
+        [--barber 42] [--batch-size 50] [--check]
+"""
+import argparse
+import sys
+from contextlib import ExitStack
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.core.locks import BookingConflictError, barber_write_lock
+from app.crud.crud_stats import COUNTERS
+from app.models.models import BarberDailyStats, Booking, User
+
+# Kilit zaman aşımında bir parti en fazla bu kadar denenir
+MAX_ATTEMPTS = 3
+
+
+def _minutes(dialect_name: str):
+    """Booking length in minutes (end_time - start_time) for the dialect"""
+    if dialect_name == "postgresql":
+        return func.extract("epoch", Booking.end_time - Booking.start_time) / 60
+    return (func.julianday(Booking.end_time) - func.julianday(Booking.start_time)) * 1440
+
+
+def _as_date(value) -> date:
+    # SQLite date() metin döndürür
+    return value if isinstance(value, date) else date.fromisoformat(str(value))
+
+
+def compute_rollups(
+    db: Session,
+    barber_ids: List[int],
+    start_date: Optional[date],
+    end_date: Optional[date]
+) -> Dict[Tuple[int, date], dict]:
+    active = Booking.status != "cancelled"
+    day = func.date(Booking.start_time)
+    stmt = select(
+        Booking.barber_id,
+        day.label("day"),
+        func.sum(case((active, 1), else_=0)),
+        func.sum(case((active, 0), else_=1)),
+        func.sum(case((active, func.coalesce(Booking.price, 0)), else_=0)),
+        func.sum(case((active, _minutes(db.get_bind().dialect.name)), else_=0)),
+    ).where(
+        Booking.barber_id.in_(barber_ids)
+    ).group_by(Booking.barber_id, day)
+    if start_date is not None:
+        stmt = stmt.where(Booking.start_time >= datetime.combine(start_date, time.min))
+    if end_date is not None:
+        stmt = stmt.where(Booking.start_time < datetime.combine(end_date + timedelta(days=1), time.min))
+
+    rollups = {}
+    for barber_id, row_day, bookings, cancellations, revenue, minutes in db.execute(stmt):
+        row_day = _as_date(row_day)
+        rollups[(barber_id, row_day)] = {
+            "barber_id": barber_id,
+            "day": row_day,
+            "bookings": int(bookings or 0),
+            "cancellations": int(cancellations or 0),
+            "revenue": float(revenue or 0.0),
+            "booked_minutes": int(round(minutes or 0)),
+        }
+    return rollups
+
+
+def _stats_filter(barber_ids: List[int], start_date: Optional[date], end_date: Optional[date]):
+    conditions = [BarberDailyStats.barber_id.in_(barber_ids)]
+    if start_date is not None:
+        conditions.append(BarberDailyStats.day >= start_date)
+    if end_date is not None:
+        conditions.append(BarberDailyStats.day <= end_date)
+    return conditions
+
+
+def _differs(stored: BarberDailyStats, expected: Optional[dict]) -> bool:
+    if expected is None:
+        return any(getattr(stored, column) for column in COUNTERS)
+    return any(
+        abs(getattr(stored, column) - expected[column]) > 1e-6 for column in COUNTERS
+    )
+
+
+def process_batch(
+    db: Session,
+    barber_ids: List[int],
+    start_date: Optional[date],
+    end_date: Optional[date],
+    check: bool
+) -> int:
+    """Rebuild (or with check, compare) one batch; returns the number of differing days"""
+    with ExitStack() as locks:
+        for barber_id in barber_ids:
+            locks.enter_context(barber_write_lock(db, barber_id))
+        expected = compute_rollups(db, barber_ids, start_date, end_date)
+        stored = {
+            (row.barber_id, row.day): row
+            for row in db.query(BarberDailyStats).filter(*_stats_filter(barber_ids, start_date, end_date))
+        }
+        differing = sum(1 for key, row in stored.items() if _differs(row, expected.get(key)))
+        differing += sum(1 for key in expected if key not in stored)
+        if check:
+            db.rollback()
+            return differing
+
+        db.execute(delete(BarberDailyStats).where(*_stats_filter(barber_ids, start_date, end_date)))
+        if expected:
+            db.execute(insert(BarberDailyStats), list(expected.values()))
+        db.commit()
+    return differing
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--from", dest="start_date", type=date.fromisoformat)
+    parser.add_argument("--to", dest="end_date", type=date.fromisoformat)
+    parser.add_argument("--barber", type=int, help="only this barber")
+    parser.add_argument("--batch-size", type=int, default=50, help="barbers per transaction")
+    parser.add_argument("--check", action="store_true", help="report differences, write nothing")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    total = 0
+    processed = 0
+    last_id = 0
+    try:
+        while True:
+            query = db.query(User.id).filter(User.is_barber == True, User.id > last_id)
+            if args.barber is not None:
+                query = query.filter(User.id == args.barber)
+            barber_ids = [row.id for row in query.order_by(User.id).limit(args.batch_size)]
+            # Kilitler ve sorgular yeni bir transaction'da başlasın
+            db.rollback()
+            if not barber_ids:
+                break
+            for attempt in range(1, MAX_ATTEMPTS + 1):
+                try:
+                    total += process_batch(db, barber_ids, args.start_date, args.end_date, args.check)
+                    break
+                except BookingConflictError:
+                    # Yoğun randevu yazması kilidi tutuyor: partiyi yeniden dene
+                    if attempt == MAX_ATTEMPTS:
+                        raise
+            processed += len(barber_ids)
+            last_id = barber_ids[-1]
+            print(f"{processed} barbers, {total} differing day(s)", flush=True)
+    finally:
+        db.close()
+
+    verb = "differ" if args.check else "were repaired"
+    print(f"done: {processed} barbers, {total} day rollup(s) {verb}")
+    return 1 if args.check and total else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
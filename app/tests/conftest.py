@@ -0,0 +1,67 @@
+import asyncio
+import os
+import tempfile
+from pathlib import Path
+
+# Uygulama modülleri içe aktarılmadan önce: testler kendi veritabanında çalışır (.env'deki değil)
+_TEST_DIR = tempfile.mkdtemp(prefix="barber-tests-")
+os.environ["DATABASE_URL"] = os.environ.get("TEST_DATABASE_URL", f"sqlite:///{_TEST_DIR}/test.db")
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+os.environ["IDEMPOTENCY_BACKEND"] = "memory"
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+import httpx
+import pytest
+from alembic import command
+from alembic.config import Config
+
+from app.core.availability import availability_cache
+from app.core.schedule import schedule_cache
+from app.core.security import principal_cache
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+@pytest.fixture(scope="session", autouse=True)
+def migrated_database():
+    command.upgrade(Config(str(ROOT / "alembic.ini")), "head")
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # Sorgu sayıları önbelleğin soğuk halinde ölçülür; testler birbirini etkilemez
+    for cache in (availability_cache, schedule_cache, principal_cache):
+        cache.clear()
+    yield
+
+
+class ASGIClient:
+    """
+    Synchronous client that runs the app on this thread's event loop, so context
+    variables set by the test (assert_max_queries) are seen by the request.
+    """
+
+    def __init__(self, app):
+        self.loop = asyncio.new_event_loop()
+        self.http = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://testserver")
+
+    def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        return self.loop.run_until_complete(self.http.request(method, url, **kwargs))
+
+    def get(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self) -> None:
+        self.loop.run_until_complete(self.http.aclose())
+        self.loop.close()
+
+
+@pytest.fixture(scope="session")
+def client(migrated_database):
+    from app.main import app
+    client = ASGIClient(app)
+    yield client
+    client.close()
@@ -0,0 +1,180 @@
+"""
+Concurrency check of booking creation (the small version of
+benchmarks/stress_double_booking.py): parallel attempts at overlapping slots of
+one barber through the sync and async paths must never leave two confirmed
+bookings overlapping.
+"""
+import asyncio
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, SessionLocal
+from app.core.locks import BarberBusyError, BookingConflictError, barber_write_lock, barber_write_lock_async
+from app.crud.crud_booking import create_booking, create_booking_async
+from app.models.models import Booking, Service, User
+
+ATTEMPTS = 200
+BASE = datetime(2098, 3, 2, 9, 0)
+
+
+def _seed() -> Service:
+    db = SessionLocal()
+    try:
+        barber = User(email=f"race-{uuid.uuid4().hex}@example.com", hashed_password="-", is_barber=True)
+        db.add(barber)
+        db.flush()
+        service = Service(name="Race cut", duration=30, price=10.0, barber_id=barber.id)
+        db.add(service)
+        db.commit()
+        db.refresh(service)
+        db.expunge(service)
+        return service
+    finally:
+        db.close()
+
+
+def _booking_data(service_id: int, start: datetime) -> dict:
+    return {
+        "service_id": service_id,
+        "start_time": start,
+        "customer_name": "Race",
+        "customer_email": "race@example.com",
+        "customer_phone": "0",
+        "notes": None,
+    }
+
+
+def _sync_attempt(service_id: int, start: datetime) -> str:
+    db = SessionLocal()
+    try:
+        create_booking(db, _booking_data(service_id, start))
+        return "created"
+    except BookingConflictError:
+        return "conflict"
+    finally:
+        db.close()
+
+
+async def _async_attempt(service_id: int, start: datetime) -> str:
+    async with AsyncSessionLocal() as db:
+        try:
+            await create_booking_async(db, _booking_data(service_id, start))
+            return "created"
+        except BookingConflictError:
+            return "conflict"
+
+
+def test_parallel_bookings_never_overlap():
+    service = _seed()
+    # 10 dakika arayla 12 başlangıç, 30 dakikalık servis: komşu slotlar birbiriyle çakışır
+    starts = [BASE + timedelta(minutes=10 * (i % 12)) for i in range(ATTEMPTS)]
+    half = len(starts) // 2
+    outcomes: Counter = Counter()
+
+    def run_async_half():
+        async def run():
+            return await asyncio.gather(*(_async_attempt(service.id, start) for start in starts[half:]))
+        outcomes.update(asyncio.run(run()))
+
+    async_thread = threading.Thread(target=run_async_half)
+    async_thread.start()
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        outcomes.update(pool.map(lambda start: _sync_attempt(service.id, start), starts[:half]))
+    async_thread.join()
+
+    # Her deneme ya oluşturuldu ya da 409'a dönüşen tipli çakışma aldı (başka hata yok)
+    assert sum(outcomes.values()) == ATTEMPTS
+    assert set(outcomes) <= {"created", "conflict"}
+    assert outcomes["created"] >= 1
+
+    db = SessionLocal()
+    try:
+        rows = db.query(Booking.start_time, Booking.end_time).filter(
+            Booking.barber_id == service.barber_id,
+            Booking.status == "confirmed"
+        ).order_by(Booking.start_time).all()
+    finally:
+        db.close()
+    assert len(rows) == outcomes["created"]
+    overlaps = [(prev, cur) for prev, cur in zip(rows, rows[1:]) if cur.start_time < prev.end_time]
+    assert overlaps == []
+
+
+def _hold_lock(barber_id: int, seconds: float, held: threading.Event) -> threading.Thread:
+    def hold():
+        db = SessionLocal()
+        try:
+            with barber_write_lock(db, barber_id):
+                held.set()
+                time.sleep(seconds)
+        finally:
+            db.close()
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    held.wait()
+    return thread
+
+
+def test_sync_and_async_writers_share_the_lock():
+    barber_id = _seed().barber_id
+    held = threading.Event()
+    holder = _hold_lock(barber_id, 0.3, held)
+
+    async def enter() -> float:
+        async with AsyncSessionLocal() as db:
+            async with barber_write_lock_async(db, barber_id):
+                return time.monotonic()
+
+    began = time.monotonic()
+    entered = asyncio.run(enter())
+    holder.join()
+    # Async yazar senkron yazarın bırakmasını bekledi
+    assert entered - began >= 0.25
+    # Başka bir olay döngüsünden de aynı kilit kullanılabilir
+    assert asyncio.run(enter()) > entered
+
+
+def test_busy_lock_times_out_and_cancelled_waiter_releases(monkeypatch):
+    monkeypatch.setattr(settings, "BOOKING_LOCK_TIMEOUT_MS", 50)
+    barber_id = _seed().barber_id
+    held = threading.Event()
+    holder = _hold_lock(barber_id, 0.3, held)
+
+    async def try_enter():
+        async with AsyncSessionLocal() as db:
+            async with barber_write_lock_async(db, barber_id):
+                pass
+
+    with pytest.raises(BarberBusyError):
+        asyncio.run(try_enter())
+
+    async def cancel_waiter():
+        monkeypatch.setattr(settings, "BOOKING_LOCK_TIMEOUT_MS", 2000)
+        task = asyncio.ensure_future(try_enter())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        # İptal edilen bekleyicinin iş parçacığı kilidi alıp bırakana kadar bekle
+        await asyncio.sleep(0.5)
+
+    asyncio.run(cancel_waiter())
+    holder.join()
+    # Kilit serbest kalmış olmalı: kısa zaman aşımıyla hemen alınır
+    monkeypatch.setattr(settings, "BOOKING_LOCK_TIMEOUT_MS", 50)
+    db = SessionLocal()
+    try:
+        with barber_write_lock(db, barber_id):
+            pass
+    finally:
+        db.close()
@@ -0,0 +1,122 @@
+"""
+Query-count regression guards: the hot read endpoints must issue a fixed number
+of queries, independent of page size or the number of barbers.
+"""
+import uuid
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from app.core.availability import availability_cache
+from app.core.database import SessionLocal, assert_max_queries, track_queries
+from app.core.schedule import schedule_cache
+from app.models.models import Booking, Service, User, WorkingHours
+
+BARBERS = 6
+# Pazartesi; tohum randevuları bu haftadadır
+MONDAY = date(2030, 6, 3)
+
+
+def _add_barber(db, index: int) -> User:
+    barber = User(
+        email=f"qc-{uuid.uuid4().hex}@example.com",
+        hashed_password="-",
+        full_name=f"Query Count {index}",
+        is_barber=True,
+    )
+    db.add(barber)
+    db.flush()
+    for minutes in (30, 45):
+        db.add(Service(name=f"Cut {minutes}", duration=minutes, price=10.0, barber_id=barber.id))
+    for weekday in range(5):
+        db.add(WorkingHours(
+            day_of_week=weekday, start_time=time(9), end_time=time(17), is_working=True, barber_id=barber.id
+        ))
+    db.flush()
+    for day in range(5):
+        start = datetime.combine(MONDAY + timedelta(days=day), time(10))
+        db.add(Booking(
+            customer_name="Seed", customer_email="seed@example.com", customer_phone="0",
+            start_time=start, end_time=start + timedelta(minutes=30), status="confirmed",
+            barber_id=barber.id, service_id=barber.services[0].id, price=10.0,
+        ))
+    return barber
+
+
+@pytest.fixture(scope="module")
+def barbers():
+    db = SessionLocal()
+    try:
+        rows = [_add_barber(db, index) for index in range(BARBERS)]
+        db.commit()
+        return [(barber.id, barber.services[0].id) for barber in rows]
+    finally:
+        db.close()
+
+
+def _count(client, url: str, **params) -> int:
+    with track_queries() as stats:
+        response = client.get(url, params=params)
+    assert response.status_code == 200, response.text
+    return stats.count
+
+
+def test_barber_list_with_expand_is_constant(client, barbers):
+    url = "/api/v1/barbers"
+    with assert_max_queries(3):
+        response = client.get(url, params={"expand": "services,working_hours", "limit": 1000})
+    assert response.status_code == 200
+    seeded = {barber_id for barber_id, _ in barbers}
+    items = [item for item in response.json() if item["id"] in seeded]
+    assert len(items) == BARBERS
+    assert all(len(item["services"]) == 2 and len(item["working_hours"]) == 5 for item in items)
+
+    # Sayfa boyutu sorgu sayısını değiştirmez (ilişki başına tek selectin sorgusu)
+    assert _count(client, url, expand="services,working_hours", limit=2) == \
+        _count(client, url, expand="services,working_hours", limit=1000)
+
+
+def test_barber_full_profile(client, barbers):
+    barber_id, _ = barbers[0]
+    with assert_max_queries(4):
+        response = client.get(f"/api/v1/barbers/{barber_id}/full")
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["services"]) == 2 and len(body["working_hours"]) == 5
+
+
+def test_availability_range(client, barbers):
+    barber_id, service_id = barbers[0]
+    params = {"service_id": service_id, "from": MONDAY.isoformat(), "to": (MONDAY + timedelta(days=6)).isoformat()}
+    url = f"/api/v1/barbers/{barber_id}/availability"
+    # Soğuk önbellek: servis, program (çalışma saatleri + istisnalar) ve haftanın randevuları
+    with assert_max_queries(4):
+        response = client.get(url, params=params)
+    assert response.status_code == 200
+    assert len(response.json()) == 7
+
+    # Aynı hafta önbellekten: veritabanına gidilmez
+    with assert_max_queries(0):
+        assert client.get(url, params=params).status_code == 200
+
+
+def test_available_barber_search_is_constant(client, barbers):
+    url = "/api/v1/barbers/available"
+    with assert_max_queries(4):
+        response = client.get(url, params={"date": MONDAY.isoformat()})
+    assert response.status_code == 200
+    found = {item["barber"]["id"] for item in response.json()}
+    assert {barber_id for barber_id, _ in barbers} <= found
+
+    # Daha fazla berber aynı sayıda sorguyla aranır
+    db = SessionLocal()
+    try:
+        for index in range(BARBERS, 2 * BARBERS):
+            _add_barber(db, index)
+        db.commit()
+    finally:
+        db.close()
+    availability_cache.clear()
+    schedule_cache.clear()
+    with assert_max_queries(4):
+        assert client.get(url, params={"date": MONDAY.isoformat()}).status_code == 200
@@ -0,0 +1,92 @@
+"""
+Concurrent schedule writes of one barber must leave the cached compiled
+schedule equal to a fresh compilation of the committed rows.
+"""
+import time as clock
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time
+
+from app.core.database import SessionLocal
+from app.core.schedule import schedule_cache
+from app.crud.crud_barber import get_compiled_schedule, replace_schedule_exceptions, update_barber_working_hours
+from app.models.models import User
+from app.models.schemas import ScheduleExceptionCreate, WorkingHoursCreate
+
+ROUNDS = 5
+DAY = date(2030, 6, 3)
+
+
+def _seed() -> int:
+    db = SessionLocal()
+    try:
+        barber = User(email=f"sched-{uuid.uuid4().hex}@example.com", hashed_password="-", is_barber=True)
+        db.add(barber)
+        db.commit()
+        return barber.id
+    finally:
+        db.close()
+
+
+def _put_hours(barber_id: int, weekday: int, end_hour: int) -> None:
+    db = SessionLocal()
+    try:
+        # Diğer günler aynı kalır; yalnızca `weekday` değişir
+        hours = [
+            WorkingHoursCreate(day_of_week=day, start_time=time(9), end_time=time(end_hour if day == weekday else 17))
+            for day in range(7)
+        ]
+        update_barber_working_hours(db, barber_id, hours)
+    finally:
+        db.close()
+
+
+def _put_exception(barber_id: int, end_hour: int) -> None:
+    db = SessionLocal()
+    try:
+        replace_schedule_exceptions(db, barber_id, DAY, [
+            ScheduleExceptionCreate(start_time=time(8), end_time=time(end_hour), is_working=False)
+        ])
+    finally:
+        db.close()
+
+
+def _fresh(barber_id: int):
+    schedule_cache.delete(barber_id)
+    db = SessionLocal()
+    try:
+        return get_compiled_schedule(db, barber_id)
+    finally:
+        db.close()
+
+
+def test_concurrent_schedule_writes_keep_cache_consistent(monkeypatch):
+    barber_id = _seed()
+    # Okuma ile yeniden yazma arasındaki pencere genişletilir: kilitsiz yamalar birbirini ezerdi
+    get = schedule_cache.get
+
+    def slow_get(key):
+        value = get(key)
+        clock.sleep(0.02)
+        return value
+
+    monkeypatch.setattr(schedule_cache, "get", slow_get)
+    _put_hours(barber_id, 0, 17)
+    for round_ in range(ROUNDS):
+        db = SessionLocal()
+        try:
+            get_compiled_schedule(db, barber_id)
+        finally:
+            db.close()
+        end_hour = 18 + round_ % 4
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = [
+                pool.submit(_put_hours, barber_id, 1, end_hour),
+                pool.submit(_put_hours, barber_id, 2, end_hour + 1),
+                pool.submit(_put_exception, barber_id, 9 + round_ % 3),
+            ]
+            for future in futures:
+                future.result()
+        cached = schedule_cache.get(barber_id)
+        assert cached is not None
+        assert cached == _fresh(barber_id), f"round {round_}"
@@ -0,0 +1,57 @@
+"""
+Working hours validation applies to writes only: rows stored before the rules
+existed (e.g. a closed day as 00:00-00:00) must still read back.
+"""
+import uuid
+from datetime import time
+
+from app.core.database import SessionLocal
+from app.core.security import create_access_token
+from app.models.models import User, WorkingHours
+
+
+def _barber_with_hours(hours) -> User:
+    db = SessionLocal()
+    try:
+        barber = User(email=f"wh-{uuid.uuid4().hex}@example.com", hashed_password="-", is_barber=True)
+        db.add(barber)
+        db.flush()
+        for day_of_week, start, end, is_working in hours:
+            db.add(WorkingHours(
+                day_of_week=day_of_week, start_time=start, end_time=end, is_working=is_working, barber_id=barber.id
+            ))
+        db.commit()
+        db.refresh(barber)
+        db.expunge(barber)
+        return barber
+    finally:
+        db.close()
+
+
+def test_legacy_closed_day_reads_back(client):
+    barber = _barber_with_hours([
+        (0, time(9), time(17), True),
+        (6, time(0), time(0), False),
+    ])
+    response = client.get(f"/api/v1/barbers/{barber.id}/working-hours")
+    assert response.status_code == 200, response.text
+    assert [row["is_working"] for row in response.json()] == [True, False]
+
+    response = client.get(f"/api/v1/barbers/{barber.id}/full")
+    assert response.status_code == 200, response.text
+    assert len(response.json()["working_hours"]) == 2
+
+
+def test_put_accepts_closed_day_and_rejects_empty_interval(client):
+    barber = _barber_with_hours([])
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': barber.email})}"}
+    url = f"/api/v1/barbers/{barber.id}/working-hours"
+
+    closed = {"day_of_week": 6, "start_time": "00:00", "end_time": "00:00", "is_working": False}
+    response = client.request("PUT", url, json=[closed], headers=headers)
+    assert response.status_code == 200, response.text
+
+    empty = {"day_of_week": 0, "start_time": "17:00", "end_time": "09:00", "is_working": True}
+    assert client.request("PUT", url, json=[empty], headers=headers).status_code == 422
+    bad_day = {"day_of_week": 7, "start_time": "09:00", "end_time": "17:00"}
+    assert client.request("PUT", url, json=[bad_day], headers=headers).status_code == 422
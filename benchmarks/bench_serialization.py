@@ -0,0 +1,122 @@
+"""
+Compare the regular (ORM + pydantic + stdlib json) and fast (row tuples + orjson)
+response paths of the list endpoints.
+
+    DATABASE_URL=sqlite:////tmp/bench.db python -m benchmarks.bench_serialization --rows 100
+
+For every endpoint both paths must return identical JSON; the script exits with
+status 1 otherwise. Timings are printed as JSON.
+"""
+import argparse
+import json
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.pagination import encode_cursor
+from app.core.security import create_access_token
+from app.main import app
+from app.models.models import Booking, Service, User
+from benchmarks.common import migrate
+
+
+def seed(rows: int) -> tuple:
+    db = SessionLocal()
+    try:
+        tag = uuid.uuid4().hex[:8]
+        barbers = [
+            User(
+                email=f"bench-{tag}-{i}@example.com",
+                hashed_password="-",
+                full_name=f"Barber {i}",
+                phone_number=f"+90-{tag}-{i}",
+                is_barber=True,
+                barber_bio="Fades, beards and classic cuts",
+                barber_shop_name=f"Shop {i}",
+                barber_shop_address=f"Street {i}, Istanbul",
+            )
+            for i in range(rows)
+        ]
+        db.add_all(barbers)
+        db.flush()
+        barber = barbers[0]
+        service = Service(name="Haircut", duration=30, price=250.0, barber_id=barber.id)
+        db.add(service)
+        db.flush()
+        start = datetime(2030, 1, 1, 9, 0)
+        db.add_all([
+            Booking(
+                customer_name=f"Customer {i}",
+                customer_email=f"customer{i}@example.com",
+                customer_phone="555",
+                start_time=start + timedelta(hours=i),
+                end_time=start + timedelta(hours=i, minutes=30),
+                status="confirmed",
+                barber_id=barber.id,
+                service_id=service.id,
+            )
+            for i in range(rows)
+        ])
+        db.commit()
+        return barber.id, barber.email, barber.id - 1
+    finally:
+        db.close()
+
+
+def timed(client: TestClient, url: str, headers: dict, repeat: int) -> tuple:
+    response = client.get(url, headers=headers)
+    began = time.perf_counter()
+    for _ in range(repeat):
+        client.get(url, headers=headers)
+    return (time.perf_counter() - began) / repeat * 1000, response
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    migrate()
+    barber_id, email, before_id = seed(args.rows)
+    auth = {"Authorization": f"Bearer {create_access_token({'sub': email})}"}
+    after = encode_cursor(before_id)
+
+    endpoints = {
+        "/users": (f"/api/v1/users?limit={args.rows}&after={after}", {}),
+        "/barbers": (f"/api/v1/barbers?limit={args.rows}&after={after}", {}),
+        "/barbers/{id}/bookings": (f"/api/v1/barbers/{barber_id}/bookings?limit={args.rows}", auth),
+    }
+
+    client = TestClient(app)
+    results = {}
+    mismatches = 0
+    for name, (url, headers) in endpoints.items():
+        settings.FAST_JSON_RESPONSES = False
+        regular_ms, regular = timed(client, url, headers, args.repeat)
+        settings.FAST_JSON_RESPONSES = True
+        fast_ms, fast = timed(client, url, headers, args.repeat)
+        settings.FAST_JSON_RESPONSES = False
+
+        identical = regular.status_code == fast.status_code == 200 and regular.json() == fast.json()
+        mismatches += not identical
+        results[name] = {
+            "rows": len(regular.json()) if regular.status_code == 200 else None,
+            "regular_ms": round(regular_ms, 3),
+            "fast_ms": round(fast_ms, 3),
+            "speedup": round(regular_ms / fast_ms, 2) if fast_ms else None,
+            "identical": identical,
+            "identical_bytes": regular.content == fast.content,
+        }
+
+    print(json.dumps(results, indent=2))
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+import json
+import math
+import platform
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+from app.core.security import create_access_token
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def migrate() -> None:
+    """Bring the benchmark database to the current schema"""
+    command.upgrade(Config(str(ROOT / "alembic.ini")), "head")
+
+
+def auth_header(email: str) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {create_access_token({'sub': email})}"}
+
+
+def percentile(sorted_samples: Sequence[float], pct: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = max(0, math.ceil(pct / 100 * len(sorted_samples)) - 1)
+    return sorted_samples[index]
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds"""
+    ordered = sorted(samples_ms)
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered), 4) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 50), 4),
+        "p95_ms": round(percentile(ordered, 95), 4),
+        "p99_ms": round(percentile(ordered, 99), 4),
+        "max_ms": round(ordered[-1], 4) if ordered else 0.0,
+    }
+
+
+def time_calls(func, repeat: int) -> List[float]:
+    """Per-call wall time of `func()` in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - began) * 1000)
+    return samples
+
+
+def run_metadata() -> Dict[str, str]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "commit": commit,
+        "python": platform.python_version(),
+        "database": make_url(settings.DATABASE_URL).get_backend_name(),
+    }
+
+
+def write_json(path: str, payload: dict) -> None:
+    Path(path).write_text(json.dumps(payload, indent=2, default=str))
@@ -0,0 +1,54 @@
+"""
+Compare two benchmark result files (from benchmarks.suite, .micro or .load).
+
+    python -m benchmarks.compare runs/before.json runs/after.json
+
+Prints the p50/p95/p99 change of every benchmark present in both files and the
+load throughput change, in percent (positive latency change = slower).
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+COMPARED = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def _delta(before: float, after: float):
+    return round((after - before) / before * 100, 1) if before else None
+
+
+def compare(before: dict, after: dict) -> dict:
+    """Percentage change per benchmark and percentile"""
+    result = {}
+    sections = [("micro", before.get("micro", {}), after.get("micro", {}))]
+    sections.append((
+        "load",
+        before.get("load", {}).get("scenarios", {}),
+        after.get("load", {}).get("scenarios", {}),
+    ))
+    for section, old, new in sections:
+        for name in old.keys() & new.keys():
+            result[f"{section}.{name}"] = {
+                f"{key}_change_pct": _delta(old[name][key], new[name][key]) for key in COMPARED
+            }
+    if "load" in before and "load" in after:
+        result["load.throughput_rps_change_pct"] = _delta(
+            before["load"]["throughput_rps"], after["load"]["throughput_rps"]
+        )
+    return dict(sorted(result.items()))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args()
+
+    before, after = (json.loads(Path(path).read_text()) for path in (args.before, args.after))
+    print(json.dumps(compare(before, after), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""
+In-process ASGI load driver.
+
+Runs a weighted mix of API requests against the application object through
+httpx's ASGI transport (no server, no network) with a fixed number of concurrent
+clients, and reports p50/p95/p99 latency per scenario plus overall throughput.
+
+    DATABASE_URL=sqlite:////tmp/bench.db python -m benchmarks.load --requests 5000 --concurrency 32 --output load.json
+
+Bookings created by the "create_booking" scenario are deleted afterwards. Rate
+limits are switched off unless --rate-limits is given, since a single simulated
+client population would otherwise measure mostly 429s.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Tuple
+
+import httpx
+from sqlalchemy import delete
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.pagination import encode_cursor
+from app.main import app
+from app.models.models import Booking
+from benchmarks.common import auth_header, migrate, run_metadata, summarize, write_json
+from benchmarks.seed import Dataset, add_arguments, generate
+
+# Oluşturma senaryosu tohumlanmış verilerin ve micro ölçümünün ilerisine yazar
+CREATE_BASE = datetime(2199, 1, 5, 0, 0)
+
+# (isim, ağırlık) - okuma ağırlıklı gerçekçi bir karışım
+DEFAULT_MIX = {
+    "list_barbers": 20,
+    "barber_full": 15,
+    "availability": 30,
+    "barber_bookings": 10,
+    "users_me": 15,
+    "search_available": 5,
+    "create_booking": 5,
+}
+
+Request = Tuple[str, str, dict, dict]
+
+
+class Scenarios:
+    """Builds the request of each scenario from the seeded dataset"""
+
+    def __init__(self, dataset: Dataset, rng: random.Random):
+        self.dataset = dataset
+        self.rng = rng
+        self.created: List[int] = []
+        self._slots = itertools.count()
+        self._customer_headers = {
+            email: auth_header(email) for email in dataset.customer_emails[:50]
+        }
+
+    def _barber(self) -> int:
+        return self.rng.choice(self.dataset.barber_ids)
+
+    def _day(self) -> str:
+        return (self.dataset.start_date + timedelta(days=self.rng.randrange(28))).isoformat()
+
+    def list_barbers(self) -> Request:
+        after = encode_cursor(self._barber())
+        return "GET", f"/api/v1/barbers?limit=50&after={after}", {}, {}
+
+    def barber_full(self) -> Request:
+        return "GET", f"/api/v1/barbers/{self._barber()}/full", {}, {}
+
+    def availability(self) -> Request:
+        barber_id = self._barber()
+        service_id, _ = self.rng.choice(self.dataset.services[barber_id])
+        day = self._day()
+        return "GET", f"/api/v1/barbers/{barber_id}/availability?from={day}&to={day}&service_id={service_id}", {}, {}
+
+    def barber_bookings(self) -> Request:
+        barber_id = self._barber()
+        index = barber_id - self.dataset.barber_ids[0]
+        headers = auth_header(f"seed{self.dataset.seed}-barber-{index}@example.com")
+        return "GET", f"/api/v1/barbers/{barber_id}/bookings?limit=50", headers, {}
+
+    def users_me(self) -> Request:
+        headers = self.rng.choice(list(self._customer_headers.values()))
+        return "GET", "/api/v1/users/me", headers, {}
+
+    def search_available(self) -> Request:
+        return "GET", f"/api/v1/barbers/available?date={self._day()}&service=Haircut", {}, {}
+
+    def create_booking(self) -> Request:
+        email = self.rng.choice(list(self._customer_headers))
+        barber_id = self._barber()
+        service_id, _ = self.dataset.services[barber_id][0]
+        # Her istek ayrı güne düşer; çakışma değil yazma yolu ölçülür
+        start = CREATE_BASE + timedelta(days=next(self._slots), hours=10)
+        body = {
+            "service_id": service_id,
+            "start_time": start.isoformat(),
+            "customer_name": "Load",
+            "customer_email": email,
+            "customer_phone": "0",
+        }
+        return "POST", "/api/v1/bookings/bookings", self._customer_headers[email], body
+
+    def builder(self, name: str) -> Callable[[], Request]:
+        return getattr(self, name)
+
+
+async def drive(scenarios: Scenarios, mix: Dict[str, int], requests: int, concurrency: int) -> dict:
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    plan = scenarios.rng.choices(names, weights=weights, k=requests)
+    queue = iter(plan)
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    statuses: Dict[str, Counter] = defaultdict(Counter)
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            for name in queue:
+                method, url, headers, body = scenarios.builder(name)()
+                began = time.perf_counter()
+                response = await client.request(method, url, headers=headers, json=body or None)
+                latencies[name].append((time.perf_counter() - began) * 1000)
+                statuses[name][response.status_code] += 1
+                if name == "create_booking" and response.status_code == 201:
+                    scenarios.created.append(response.json()["id"])
+
+        began = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - began
+
+    all_latencies = [sample for samples in latencies.values() for sample in samples]
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 2) if elapsed else None,
+        "overall": summarize(all_latencies),
+        "scenarios": {
+            name: {**summarize(latencies[name]), "status": dict(statuses[name])}
+            for name in names if latencies[name]
+        },
+    }
+
+
+def cleanup(created: List[int]) -> None:
+    if not created:
+        return
+    db = SessionLocal()
+    try:
+        db.execute(delete(Booking).where(Booking.id.in_(created)))
+        db.commit()
+    finally:
+        db.close()
+
+
+def run(dataset: Dataset, requests: int, concurrency: int, seed: int, mix: Dict[str, int] = DEFAULT_MIX) -> dict:
+    scenarios = Scenarios(dataset, random.Random(seed))
+    try:
+        return asyncio.run(drive(scenarios, mix, requests, concurrency))
+    finally:
+        cleanup(scenarios.created)
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    """'availability=5,users_me=1' -> {'availability': 5, 'users_me': 1}"""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown scenario: {name}")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help="scenario weights, e.g. availability=5,users_me=1")
+    parser.add_argument("--rate-limits", action="store_true", help="keep RATE_LIMIT_RULES active")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    settings.RATE_LIMIT_ENABLED = args.rate_limits
+    migrate()
+    dataset = generate(args.seed, args.barbers, args.customers, args.bookings)
+    payload = {
+        "meta": {**run_metadata(), "seed": args.seed, "bookings": dataset.bookings, "mix": args.mix},
+        "load": run(dataset, args.requests, args.concurrency, args.seed, args.mix),
+    }
+    if args.output:
+        write_json(args.output, payload)
+    print(json.dumps(payload, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
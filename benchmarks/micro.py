@@ -0,0 +1,176 @@
+"""
+Micro-benchmarks of the hot code paths against the seeded dataset.
+
+Covers token verification, slot calculation (cold, and cached after warming the
+same keys; the cached phase reports its hit ratio), booking creation and the
+list queries behind /users, /barbers and /barbers/{id}/bookings.
+
+    DATABASE_URL=sqlite:////tmp/bench.db python -m benchmarks.micro --repeat 200 --output micro.json
+
+Bookings created by the benchmark are deleted afterwards so runs can be repeated
+on the same database.
+"""
+import argparse
+import json
+import random
+import sys
+from datetime import datetime, time, timedelta
+from typing import Dict
+
+from sqlalchemy import delete
+
+from app.core.availability import availability_cache
+from app.core.database import SessionLocal
+from app.core.security import create_access_token, verify_token
+from app.crud.crud_booking import create_booking, get_available_slots, get_available_slots_range, get_bookings
+from app.crud.crud_user import get_barbers, get_users
+from app.models.models import Booking
+from benchmarks.common import migrate, run_metadata, summarize, time_calls, write_json
+from benchmarks.seed import Dataset, add_arguments, generate
+
+# Tohumlanmış randevuların çok ilerisi: oluşturma ölçümü mevcut verilerle çakışmaz
+CREATE_BASE = datetime(2099, 1, 5, 0, 0)
+
+
+def bench_verify_token(dataset: Dataset, repeat: int) -> dict:
+    token = create_access_token({"sub": dataset.customer_emails[0]})
+    return summarize(time_calls(lambda: verify_token(token), repeat))
+
+
+def bench_available_slots(dataset: Dataset, repeat: int, rng: random.Random) -> Dict[str, dict]:
+    db = SessionLocal()
+    try:
+        def pick():
+            barber_id = rng.choice(dataset.barber_ids)
+            service_id, _ = rng.choice(dataset.services[barber_id])
+            day = dataset.start_date + timedelta(days=rng.randrange(5))
+            return barber_id, service_id, day
+
+        calls = [pick() for _ in range(repeat)]
+        samples = iter(calls)
+
+        def cold():
+            availability_cache.clear()
+            get_available_slots(db, *next(samples))
+
+        results = {"get_available_slots.cold": summarize(time_calls(cold, repeat))}
+
+        # Önbelleği aynı anahtarlarla ısıt (ölçülmez); ölçülen turda temizleme yok
+        availability_cache.clear()
+        for call in calls:
+            get_available_slots(db, *call)
+        before = availability_cache.stats()
+        samples = iter(calls)
+        cached = summarize(time_calls(lambda: get_available_slots(db, *next(samples)), repeat))
+        after = availability_cache.stats()
+        hits = after["hits"] - before["hits"]
+        lookups = hits + after["misses"] - before["misses"]
+        cached["hit_ratio"] = round(hits / lookups, 4) if lookups else 0.0
+        if cached["hit_ratio"] < 1.0:
+            print(
+                f"warning: get_available_slots.cached hit ratio {cached['hit_ratio']} "
+                "(cache too small or TTL too short for the run?)",
+                file=sys.stderr,
+            )
+        results["get_available_slots.cached"] = cached
+
+        week = iter(calls)
+
+        def range_week():
+            availability_cache.clear()
+            barber_id, service_id, day = next(week)
+            get_available_slots_range(db, barber_id, service_id, day, day + timedelta(days=6))
+
+        results["get_available_slots_range.7d.cold"] = summarize(time_calls(range_week, repeat))
+        return results
+    finally:
+        availability_cache.clear()
+        db.close()
+
+
+def bench_create_booking(dataset: Dataset, repeat: int) -> dict:
+    barber_id = dataset.barber_ids[0]
+    service_id, duration = dataset.services[barber_id][0]
+    # Her çağrı ayrı bir günün aynı saatine: kilit + çakışma kontrolü + commit ölçülür
+    starts = iter(CREATE_BASE + timedelta(days=i, hours=10) for i in range(repeat))
+    created = []
+    db = SessionLocal()
+    try:
+        def create():
+            booking = create_booking(db, {
+                "service_id": service_id,
+                "start_time": next(starts),
+                "customer_name": "Benchmark",
+                "customer_email": dataset.customer_emails[0],
+                "customer_phone": "0",
+                "notes": None,
+            })
+            created.append(booking.id)
+
+        return summarize(time_calls(create, repeat))
+    finally:
+        db.rollback()
+        if created:
+            db.execute(delete(Booking).where(Booking.id.in_(created)))
+            db.commit()
+        db.close()
+
+
+def bench_lists(dataset: Dataset, repeat: int, limit: int) -> Dict[str, dict]:
+    middle_barber = dataset.barber_ids[len(dataset.barber_ids) // 2]
+    db = SessionLocal()
+    try:
+        cases = {
+            "get_users.offset": lambda: get_users(db, skip=middle_barber, limit=limit),
+            "get_users.keyset": lambda: get_users(db, after_id=middle_barber, limit=limit),
+            "get_barbers.keyset": lambda: get_barbers(db, after_id=middle_barber, limit=limit),
+            "get_barbers.keyset.expand": lambda: get_barbers(
+                db, after_id=middle_barber, limit=limit, expand={"services", "working_hours"}
+            ),
+            "get_bookings.first_page": lambda: get_bookings(db, middle_barber, limit=limit),
+            "get_bookings.keyset": lambda: get_bookings(
+                db, middle_barber, limit=limit,
+                after=(datetime.combine(dataset.start_date + timedelta(days=14), time.min), 0)
+            ),
+        }
+        results = {}
+        for name, call in cases.items():
+            call()
+            # Kimlik haritası büyümesin; her ölçüm ORM nesnelerini yeniden oluşturur
+            results[name] = summarize(time_calls(lambda: (call(), db.expunge_all()), repeat))
+        return results
+    finally:
+        db.close()
+
+
+def run(dataset: Dataset, repeat: int, limit: int, seed: int) -> Dict[str, dict]:
+    rng = random.Random(seed)
+    results = {"verify_token": bench_verify_token(dataset, repeat)}
+    results.update(bench_available_slots(dataset, repeat, rng))
+    results["create_booking"] = bench_create_booking(dataset, repeat)
+    results.update(bench_lists(dataset, repeat, limit))
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    migrate()
+    dataset = generate(args.seed, args.barbers, args.customers, args.bookings)
+    payload = {
+        "meta": {**run_metadata(), "seed": args.seed, "bookings": dataset.bookings, "repeat": args.repeat},
+        "micro": run(dataset, args.repeat, args.limit, args.seed),
+    }
+    if args.output:
+        write_json(args.output, payload)
+    print(json.dumps(payload, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
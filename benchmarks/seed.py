@@ -0,0 +1,252 @@
+"""
+Seeded synthetic dataset for the benchmark suite.
+
+Generates barbers, their services and working hours, customers and (by default)
+1M non-overlapping bookings. The same --seed always produces the same rows, so
+runs against a freshly migrated database are comparable.
+
+    DATABASE_URL=sqlite:////tmp/bench.db python -m benchmarks.seed --bookings 1000000
+
+Rows are written with Core executemany inserts in chunks (no ORM objects). If the
+dataset for a seed already exists it is reused instead of inserted twice.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, time as dtime, timedelta
+from typing import Dict, List, Tuple
+
+from sqlalchemy import func, insert, select
+
+from app.core.database import SessionLocal
+from app.core.security import get_password_hash
+from app.models.models import Booking, Service, User, WorkingHours
+from benchmarks.common import migrate
+
+# Randevular bu pazartesiden itibaren yerleştirilir
+BOOKING_START = date(2030, 1, 7)
+PASSWORD = "benchmark"
+CHUNK_SIZE = 10000
+
+SERVICE_MENU = [
+    ("Haircut", 30, 250.0),
+    ("Beard trim", 15, 120.0),
+    ("Haircut & beard", 45, 330.0),
+    ("Hot towel shave", 30, 200.0),
+    ("Kids cut", 20, 150.0),
+    ("Hair coloring", 60, 500.0),
+]
+
+
+@dataclass
+class Dataset:
+    seed: int
+    barber_ids: List[int]
+    # barber_id -> [(service_id, duration)]
+    services: Dict[int, List[Tuple[int, int]]]
+    customer_emails: List[str]
+    bookings: int
+    start_date: date = BOOKING_START
+
+
+def _prefix(seed: int) -> str:
+    return f"seed{seed}-"
+
+
+def _working_hours(rng: random.Random) -> List[dict]:
+    # Pazartesi-Cumartesi çalışır, açılış 8-10 arası, 8-10 saat mesai; pazar kapalı
+    opening = dtime(rng.choice([8, 9, 10]))
+    closing = dtime(min(opening.hour + rng.choice([8, 9, 10]), 21))
+    return [
+        {"day_of_week": day, "start_time": opening, "end_time": closing, "is_working": day != 6}
+        for day in range(7)
+    ]
+
+
+def _insert_chunks(db, table, rows: List[dict]) -> None:
+    for i in range(0, len(rows), CHUNK_SIZE):
+        db.execute(insert(table), rows[i:i + CHUNK_SIZE])
+
+
+def _booking_rows(rng, barber_id, services, hours, customers, count):
+    """Non-overlapping bookings of one barber, walking forward day by day"""
+    by_day = {h["day_of_week"]: h for h in hours if h["is_working"]}
+    step = timedelta(minutes=15)
+    day = BOOKING_START
+    produced = 0
+    while produced < count:
+        h = by_day.get(day.weekday())
+        if h is not None:
+            current = datetime.combine(day, h["start_time"])
+            closing = datetime.combine(day, h["end_time"])
+            while produced < count:
+                service_id, duration = rng.choice(services)
+                end = current + timedelta(minutes=duration)
+                if end > closing:
+                    break
+                # Günün ~%25'i boş kalsın ki müsaitlik hesaplaması gerçekçi olsun
+                if rng.random() < 0.25:
+                    current += step
+                    continue
+                customer = rng.randrange(len(customers))
+                yield {
+                    "customer_name": f"Customer {customer}",
+                    "customer_email": customers[customer],
+                    "customer_phone": f"+90555{customer:07d}",
+                    "start_time": current,
+                    "end_time": end,
+                    "notes": None,
+                    "status": "cancelled" if rng.random() < 0.05 else "confirmed",
+                    "barber_id": barber_id,
+                    "service_id": service_id,
+                }
+                produced += 1
+                current = end
+        day += timedelta(days=1)
+
+
+def generate(seed: int, barbers: int, customers: int, bookings: int) -> Dataset:
+    """Insert the dataset for `seed` (or load it if it already exists)"""
+    existing = load_dataset(seed)
+    if existing is not None:
+        return existing
+
+    rng = random.Random(seed)
+    prefix = _prefix(seed)
+    hashed = get_password_hash(PASSWORD)
+    db = SessionLocal()
+    try:
+        customer_emails = [f"{prefix}customer-{i}@example.com" for i in range(customers)]
+        _insert_chunks(db, User, [
+            {
+                "email": email,
+                "hashed_password": hashed,
+                "full_name": f"Customer {i}",
+                "phone_number": f"{prefix}c{i}",
+                "is_active": True,
+                "is_barber": False,
+            }
+            for i, email in enumerate(customer_emails)
+        ])
+        _insert_chunks(db, User, [
+            {
+                "email": f"{prefix}barber-{i}@example.com",
+                "hashed_password": hashed,
+                "full_name": f"Barber {i}",
+                "phone_number": f"{prefix}b{i}",
+                "is_active": True,
+                "is_barber": True,
+                "barber_bio": "Fades, beards and classic cuts",
+                "barber_shop_name": f"Shop {i}",
+                "barber_shop_address": f"Street {rng.randint(1, 500)}, Istanbul",
+            }
+            for i in range(barbers)
+        ])
+        barber_ids = list(db.scalars(
+            select(User.id).where(User.email.like(f"{prefix}barber-%")).order_by(User.id)
+        ))
+
+        hours_by_barber = {}
+        service_rows, hour_rows = [], []
+        for barber_id in barber_ids:
+            for name, duration, price in rng.sample(SERVICE_MENU, rng.randint(2, 4)):
+                service_rows.append({
+                    "name": name, "description": None, "duration": duration,
+                    "price": price, "barber_id": barber_id,
+                })
+            hours = _working_hours(rng)
+            hours_by_barber[barber_id] = hours
+            hour_rows.extend({**h, "barber_id": barber_id} for h in hours)
+        _insert_chunks(db, Service, service_rows)
+        _insert_chunks(db, WorkingHours, hour_rows)
+        db.commit()
+
+        services = _services_of(db, barber_ids)
+        per_barber, remainder = divmod(bookings, len(barber_ids))
+        buffer: List[dict] = []
+        for index, barber_id in enumerate(barber_ids):
+            count = per_barber + (index < remainder)
+            buffer.extend(_booking_rows(
+                rng, barber_id, services[barber_id], hours_by_barber[barber_id], customer_emails, count
+            ))
+            if len(buffer) >= CHUNK_SIZE:
+                _insert_chunks(db, Booking, buffer)
+                db.commit()
+                buffer = []
+        _insert_chunks(db, Booking, buffer)
+        db.commit()
+    finally:
+        db.close()
+    return load_dataset(seed)
+
+
+def _services_of(db, barber_ids: List[int]) -> Dict[int, List[Tuple[int, int]]]:
+    services: Dict[int, List[Tuple[int, int]]] = {barber_id: [] for barber_id in barber_ids}
+    rows = db.execute(
+        select(Service.barber_id, Service.id, Service.duration)
+        .where(Service.barber_id.in_(barber_ids))
+        .order_by(Service.id)
+    )
+    for barber_id, service_id, duration in rows:
+        services[barber_id].append((service_id, duration))
+    return services
+
+
+def load_dataset(seed: int):
+    """Dataset previously generated for `seed`, or None"""
+    prefix = _prefix(seed)
+    db = SessionLocal()
+    try:
+        barber_ids = list(db.scalars(
+            select(User.id).where(User.email.like(f"{prefix}barber-%")).order_by(User.id)
+        ))
+        if not barber_ids:
+            return None
+        customer_emails = list(db.scalars(
+            select(User.email).where(User.email.like(f"{prefix}customer-%")).order_by(User.id)
+        ))
+        bookings = db.scalar(
+            select(func.count(Booking.id)).where(Booking.barber_id.between(barber_ids[0], barber_ids[-1]))
+        )
+        return Dataset(
+            seed=seed,
+            barber_ids=barber_ids,
+            services=_services_of(db, barber_ids),
+            customer_emails=customer_emails,
+            bookings=bookings,
+        )
+    finally:
+        db.close()
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--barbers", type=int, default=1000)
+    parser.add_argument("--customers", type=int, default=10000)
+    parser.add_argument("--bookings", type=int, default=1000000)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    migrate()
+    began = time.perf_counter()
+    dataset = generate(args.seed, args.barbers, args.customers, args.bookings)
+    summary = asdict(dataset)
+    summary.update(
+        barbers=len(summary.pop("barber_ids")),
+        services=sum(len(s) for s in summary.pop("services").values()),
+        customers=len(summary.pop("customer_emails")),
+        seconds=round(time.perf_counter() - began, 3),
+    )
+    print(json.dumps(summary, indent=2, default=str))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
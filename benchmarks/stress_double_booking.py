@@ -0,0 +1,136 @@
+"""
+Concurrency stress check for booking creation.
+
+Fires hundreds of parallel booking attempts at a handful of overlapping slots of
+one barber - half through the sync path (threads), half through the async path
+(asyncio tasks) - then verifies that no two confirmed bookings overlap.
+
+    DATABASE_URL=sqlite:////tmp/stress.db python -m benchmarks.stress_double_booking --attempts 500
+
+The schema is migrated with Alembic first. Exits with status 1 if any overlap is found.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+
+from app.core.database import AsyncSessionLocal, SessionLocal
+from app.core.locks import BookingConflictError
+from app.crud.crud_booking import create_booking, create_booking_async
+from app.models.models import Booking, Service, User
+from benchmarks.common import migrate
+
+
+def seed() -> int:
+    db = SessionLocal()
+    try:
+        barber = User(email=f"stress-{uuid.uuid4().hex}@example.com", hashed_password="-", is_barber=True)
+        db.add(barber)
+        db.flush()
+        service = Service(name="Stress cut", duration=30, price=10, barber_id=barber.id)
+        db.add(service)
+        db.commit()
+        return service.id
+    finally:
+        db.close()
+
+
+def booking_data(service_id: int, start: datetime) -> dict:
+    return {
+        "service_id": service_id,
+        "start_time": start,
+        "customer_name": "Stress",
+        "customer_email": "stress@example.com",
+        "customer_phone": "0",
+        "notes": None,
+    }
+
+
+def sync_attempt(service_id: int, start: datetime) -> str:
+    db = SessionLocal()
+    try:
+        create_booking(db, booking_data(service_id, start))
+        return "created"
+    except BookingConflictError:
+        return "conflict"
+    except Exception as e:
+        return f"error:{type(e).__name__}"
+    finally:
+        db.close()
+
+
+async def async_attempt(service_id: int, start: datetime) -> str:
+    async with AsyncSessionLocal() as db:
+        try:
+            await create_booking_async(db, booking_data(service_id, start))
+            return "created"
+        except BookingConflictError:
+            return "conflict"
+        except Exception as e:
+            return f"error:{type(e).__name__}"
+
+
+def count_overlaps(service_id: int) -> int:
+    db = SessionLocal()
+    try:
+        barber_id = db.query(Service.barber_id).filter(Service.id == service_id).scalar()
+        rows = db.query(Booking.start_time, Booking.end_time).filter(
+            Booking.barber_id == barber_id,
+            Booking.status == "confirmed"
+        ).order_by(Booking.start_time).all()
+    finally:
+        db.close()
+    return sum(1 for prev, cur in zip(rows, rows[1:]) if cur.start_time < prev.end_time)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--attempts", type=int, default=400)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    migrate()
+    service_id = seed()
+
+    # 10 dakika arayla 12 başlangıç, 30 dakikalık servis: komşu slotlar birbiriyle çakışır
+    rng = random.Random(args.seed)
+    base = datetime(2099, 1, 1, 9, 0) + timedelta(days=rng.randint(0, 3000))
+    starts = [base + timedelta(minutes=10 * rng.randrange(12)) for _ in range(args.attempts)]
+    half = len(starts) // 2
+
+    outcomes: Counter = Counter()
+
+    def run_async_half():
+        async def run():
+            return await asyncio.gather(*(async_attempt(service_id, s) for s in starts[half:]))
+        outcomes.update(asyncio.run(run()))
+
+    began = time.perf_counter()
+    async_thread = threading.Thread(target=run_async_half)
+    async_thread.start()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        outcomes.update(pool.map(lambda s: sync_attempt(service_id, s), starts[:half]))
+    async_thread.join()
+    elapsed = time.perf_counter() - began
+
+    overlaps = count_overlaps(service_id)
+    print(json.dumps({
+        "attempts": args.attempts,
+        "outcomes": dict(outcomes),
+        "overlaps": overlaps,
+        "seconds": round(elapsed, 3),
+    }, indent=2))
+    return 1 if overlaps else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""
+Full benchmark run: seed (once per database), micro-benchmarks and the ASGI load
+driver, written to a single JSON file.
+
+    DATABASE_URL=sqlite:////tmp/bench.db python -m benchmarks.suite --output runs/$(git rev-parse --short HEAD).json
+
+Compare two runs with benchmarks.compare.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from app.core.config import settings
+from benchmarks import load, micro
+from benchmarks.common import migrate, run_metadata, write_json
+from benchmarks.seed import add_arguments, generate
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    # Ölçüm uygulamanın kendisi içindir; hız sınırları load.py --rate-limits ile ayrıca ölçülür
+    settings.RATE_LIMIT_ENABLED = False
+    migrate()
+    dataset = generate(args.seed, args.barbers, args.customers, args.bookings)
+    payload = {
+        "meta": {
+            **run_metadata(),
+            "seed": args.seed,
+            "bookings": dataset.bookings,
+            "repeat": args.repeat,
+        },
+        "micro": micro.run(dataset, args.repeat, args.limit, args.seed),
+        "load": load.run(dataset, args.requests, args.concurrency, args.seed),
+    }
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        write_json(args.output, payload)
+    print(json.dumps(payload, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,23 @@
+# Çok süreçli sunum: uygulama ana süreçte bir kez yüklenir, worker'lar fork ile kopyalanır.
+#   gunicorn app.main:app -c gunicorn.conf.py
+# preload_app zorunludur: önbelleklerin worker'lar arası geçersiz kılma kanalı (app.core.cache.shared_versions)
+# import sırasında oluşturulan paylaşımlı bellektir ve yalnızca fork ile aktarılır.
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8001")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+# SSE akışları uzun yaşar; worker zaman aşımı yalnızca takılan süreçleri yakalamalı
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+graceful_timeout = 30
+keepalive = 5
+accesslog = None
+
+
+def post_fork(server, worker):
+    # Ana süreçten devralınan veritabanı bağlantıları worker'lar arasında paylaşılmamalı
+    from app.core.database import dispose_engines_after_fork
+
+    dispose_engines_after_fork()